@@ -0,0 +1,57 @@
+'''
+    Compare the compiled model parsers with the per-field interpreted
+    path on synthetic Worklogs payloads.
+
+        python -m benchmarks.bench_models [rows ...]
+'''
+import sys
+import timeit
+
+from tempo.api.models import Worklog, Worklogs
+
+from benchmarks.payloads import worklogs
+
+
+def interpreted(records):
+    items = []
+    for data in records:
+        item = Worklog.__new__(Worklog)
+        item.raw_data = data
+        item.self_link = data.get('self')
+        for field in Worklog.fields:
+            setattr(item, field.name, field.value(data))
+        items.append(item)
+    return items
+
+
+def compiled(records):
+    return Worklog.from_list(records, eager=True)
+
+
+def lazy(payload):
+    return [
+        (worklog.issue.key, worklog.time_spent)
+        for worklog in Worklogs(payload)
+    ]
+
+
+def best_of(f, arg, repeat=5):
+    return min(timeit.repeat(lambda: f(arg), number=1, repeat=repeat))
+
+
+def main(sizes):
+    print(f'{"rows":>8} {"interpreted":>12} {"compiled":>12} {"lazy":>12}')
+    for size in sizes:
+        payload = worklogs(size)
+        records = payload['results']
+        times = (
+            best_of(interpreted, records),
+            best_of(compiled, records),
+            best_of(lazy, payload),
+        )
+        print(f'{size:>8} ' + ' '.join(f'{t * 1000:>10.1f}ms' for t in times))
+        print(f'{"":>8} compiled speed-up: {times[0] / times[1]:.2f}x')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000])
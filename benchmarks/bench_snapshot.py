@@ -0,0 +1,39 @@
+'''
+    Compare loading Worklogs from a JSON response body with loading
+    them from a snapshot.
+
+        python -m benchmarks.bench_snapshot [rows ...]
+'''
+import json
+import sys
+import timeit
+
+from tempo.api import snapshot
+from tempo.api.models import Worklogs
+
+from benchmarks.payloads import worklogs
+
+
+def best_of(f, repeat=5):
+    # timeit turns the garbage collector off, the application does not.
+    return min(timeit.repeat(f, 'gc.enable()', number=1, repeat=repeat))
+
+
+def main(sizes):
+    print(f'{"rows":>8} {"json":>10} {"snapshot":>10} {"json size":>10} '
+          f'{"snapshot size":>14}')
+    for size in sizes:
+        payload = worklogs(size)
+        body = json.dumps(payload).encode()
+        data = snapshot.dumps(Worklogs(payload))
+        from_json = best_of(lambda: Worklogs(json.loads(body)))
+        from_snapshot = best_of(lambda: snapshot.loads(data))
+        print(
+            f'{size:>8} {from_json * 1000:>8.1f}ms '
+            f'{from_snapshot * 1000:>8.1f}ms '
+            f'{len(body) // 1024:>8}KB {len(data) // 1024:>12}KB'
+        )
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [2000, 20000])
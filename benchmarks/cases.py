@@ -0,0 +1,173 @@
+'''
+    Benchmark cases for the hot paths: decoding worklog payloads, the
+    api_request wrapper, rendering the week view and fetching worklogs
+    over HTTP.
+'''
+import contextlib
+import curses
+import datetime
+import shutil
+import tempfile
+
+from tempo.api.decorators import api_request, result_cache
+from tempo.api.models import Worklog, Worklogs
+
+from benchmarks.payloads import worklog, worklogs
+from benchmarks.suite import case
+
+SIZES = [1000, 10000, 100000]
+
+
+@case('models.lazy', quick=[1000, 10000], rows=SIZES)
+def models_lazy(rows):
+    payload = worklogs(rows)
+
+    def parse():
+        return [
+            (item.issue.key, item.time_spent) for item in Worklogs(payload)
+        ]
+    return parse
+
+
+@case('models.eager', quick=[1000, 10000], rows=SIZES)
+def models_eager(rows):
+    records = worklogs(rows)['results']
+    return lambda: Worklog.from_list(records, eager=True)
+
+
+class Client:
+    identity = 'benchmark'
+
+    def plain(self, key):
+        return key
+
+    @api_request
+    def coalesced(self, key):
+        return key
+
+    @api_request(cache=True, ttl=60 * 60)
+    def cached(self, key):
+        return key
+
+
+@case('api_request.overhead', call=['plain', 'coalesced', 'cached'])
+def api_request_overhead(call):
+    client = Client()
+    result_cache.invalidate()
+    return lambda: getattr(client, call)('DUM-1')
+
+
+class Screen:
+    def __init__(self, lines=50, columns=200):
+        self.size = (lines, columns)
+
+    def getmaxyx(self):
+        return self.size
+
+    def addstr(self, *args):
+        pass
+
+
+class FakeIssues:
+    def get(self, key):
+        return None
+
+    def missing(self, keys):
+        return []
+
+
+class FakeJira:
+    issue_resolver = FakeIssues()
+
+    def myself(self, callback=None, **kwargs):
+        callback(None)
+
+
+class FakeTempo:
+    def __init__(self, worklogs):
+        self.worklogs = worklogs
+
+    def all_worklogs(self, callback=None, **kwargs):
+        callback(self.worklogs)
+
+    def user_schedules(self, callback=None, **kwargs):
+        callback([])
+
+
+def week_of_worklogs(count: int, first_day: datetime.date) -> list:
+    records = []
+    for i in range(count):
+        day = first_day + datetime.timedelta(i % 7)
+        record = worklog(i)
+        record['startDate'] = f'{day:%Y-%m-%d}'
+        records.append(record)
+    return Worklog.from_list(records)
+
+
+@contextlib.contextmanager
+def without_colours():
+    '''
+        Colours need an initialised terminal, the screen is not real.
+    '''
+    color_pair = curses.color_pair
+    curses.color_pair = lambda number: 0
+    try:
+        yield
+    finally:
+        curses.color_pair = color_pair
+
+
+@case('ui.my_work_display', worklogs=[10, 100, 1000])
+def my_work_display(worklogs):
+    from tempo_cli.ui.components.my_work import MyWork
+    page = MyWork(
+        date=datetime.date(2019, 1, 7),
+        stdscr=Screen(),
+        tempo=FakeTempo([]),
+        jira=FakeJira(),
+        close=None,
+        on_top=lambda page: False,
+    )
+    page.set_worklogs(week_of_worklogs(worklogs, page.daterange()[0]))
+
+    def display():
+        with without_colours():
+            page.display()
+    return display
+
+
+class EndToEnd:
+    '''
+        Tempo.worklogs against the stub server, covering the session,
+        JSON decoding and model construction.
+    '''
+    def __init__(self, rows):
+        from tempo.api import Tempo
+        from tempo.api.http_cache import DiskCache
+        from tempo.api.session import create_session
+        from tempo.stub_server import Dataset, Stub, StubServer
+
+        self.server = StubServer(
+            Stub(Dataset(worklogs=rows), max_limit=rows)
+        ).start()
+        self.cache_dir = tempfile.mkdtemp()
+        self.tempo = Tempo(
+            'token',
+            session=create_session(),
+            http_cache=DiskCache(self.cache_dir),
+        )
+        self.tempo.base_url = self.server.url
+        self.rows = rows
+
+    def __call__(self):
+        for item in self.tempo.worklogs(limit=self.rows):
+            item.issue.key
+
+    def close(self):
+        self.server.stop()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+@case('http.worklogs', quick=[100, 1000], rows=[100, 1000, 10000])
+def http_worklogs(rows):
+    return EndToEnd(rows)
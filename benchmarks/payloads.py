@@ -0,0 +1,22 @@
+import random
+
+from tempo.stub_server import synthetic_worklog as worklog
+
+
+def worklogs(count: int, offset: int = 0, limit: int = None) -> dict:
+    limit = count if limit is None else limit
+    results = [worklog(i) for i in range(offset, min(offset + limit, count))]
+    return {
+        'metadata': {
+            'count': len(results),
+            'offset': offset,
+            'limit': limit,
+        },
+        'results': results,
+    }
+
+
+def shuffled(payload: dict, seed: int = 0) -> dict:
+    results = list(payload['results'])
+    random.Random(seed).shuffle(results)
+    return dict(payload, results=results)
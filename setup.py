@@ -1,4 +1,5 @@
 import os
+import re
 
 import setuptools
 
@@ -10,12 +11,20 @@ def read(filename):
     return open(os.path.join(os.path.dirname(__file__), filename)).read()
 
 
+def version():
+    return re.search(
+        r"__version__ = '(.+)'", read('tempo_cli/__init__.py')
+    ).group(1)
+
+
 setup_kwargs = dict(
     name=PACKAGE_NAME,
-    version='0.0.1',
+    version=version(),
     description="Log work using the command line",
     long_description=read("README.md"),
-    packages=setuptools.find_packages(exclude=['tests']),
+    packages=setuptools.find_packages(
+        exclude=['tests', 'benchmarks', 'benchmarks.*']
+    ),
     zip_safe=False,
     include_package_data=True,
     scripts=['bin/tempo-cli'],
@@ -27,6 +36,10 @@ setup_kwargs = dict(
         'appdirs==1.4.3',
         'oauth2-client==1.1.0',
     ],
+    extras_require={
+        'async': ['aiohttp'],
+        'numpy': ['numpy'],
+    },
     test_requires=[
         'pytest',
     ],
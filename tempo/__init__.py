@@ -1,3 +0,0 @@
-from .logging_utils import configure_logging
-
-configure_logging()
@@ -1,3 +1,10 @@
-from .api import Tempo, Jira
+__all__ = ['Tempo', 'Jira']
 
-__all__ = [Tempo, Jira]
+
+def __getattr__(name):
+    # Importing the clients pulls in the HTTP stack, so wait until they
+    # are asked for.
+    if name in __all__:
+        from tempo.api import api
+        return getattr(api, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,300 @@
+import asyncio
+import datetime
+import email.utils
+import logging
+from urllib.parse import urljoin
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from tempo.config import config, ConfigValue
+from tempo.api import models
+from tempo.api.api import Api, DateType, Tempo, worklog_payload
+from tempo.api.decorators import returns
+from tempo.api.session import RETRY_STATUSES
+
+logger = logging.getLogger(__name__)
+
+
+def retry_after_seconds(value: str) -> float:
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0
+    now = datetime.datetime.now(when.tzinfo)
+    return max((when - now).total_seconds(), 0)
+
+
+class AsyncApi:
+    '''
+        asyncio counterpart of Api. At most `concurrency` requests are in
+        flight at once per client, and 429/5xx responses are retried with
+        the same policy as the blocking session.
+    '''
+    ApiError = Api.ApiError
+    format_param = Api.format_param
+
+    def __init__(
+        self,
+        token,
+        session=None,
+        concurrency=None,
+        timeout=None,
+        max_retries=None,
+        backoff_factor=None,
+    ):
+        if aiohttp is None:
+            raise ImportError(
+                'The async client requires aiohttp: '
+                'pip install "tempo-cli[async]"'
+            )
+        self.headers = {
+            'Authorization': f'Bearer {token}'
+        }
+        self._session = session
+        self._owns_session = session is None
+        if concurrency is None:
+            concurrency = int(config.http.pool_size)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        if timeout is None:
+            timeout = float(config.http.timeout)
+        self.timeout = timeout
+        if max_retries is None:
+            max_retries = int(config.http.max_retries)
+        self.max_retries = max_retries
+        if backoff_factor is None:
+            backoff_factor = float(config.http.backoff_factor)
+        self.backoff_factor = backoff_factor
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self):
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def should_retry(self, method, response, attempt):
+        if attempt >= self.max_retries:
+            return False
+        if response.status == 429:
+            return True
+        return method != 'post' and response.status in RETRY_STATUSES
+
+    def retry_delay(self, response, attempt):
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None:
+            return retry_after_seconds(retry_after)
+        return self.backoff_factor * (2 ** attempt)
+
+    async def request(
+        self,
+        method,
+        path,
+        params={},
+        json=None,
+        prefix=None
+    ):
+        formatted_params = {
+            key: self.format_param(value)
+            for key, value in params.items()
+            if value
+        }
+        url = urljoin(self.base_url, path)
+        logger.info(
+            'Making async %s request to %s with params %s',
+            method, url, formatted_params,
+        )
+        attempt = 0
+        while True:
+            async with self.semaphore:
+                async with self.session.request(
+                    method,
+                    url,
+                    headers=self.headers,
+                    params=formatted_params,
+                    json=json,
+                ) as r:
+                    if self.should_retry(method, r, attempt):
+                        delay = self.retry_delay(r, attempt)
+                    else:
+                        try:
+                            r.raise_for_status()
+                        except aiohttp.ClientResponseError as e:
+                            logger.exception('Exception calling %s', r.url)
+                            raise self.ApiError(
+                                e, await r.text(), status_code=r.status
+                            )
+                        return await r.json(content_type=None)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, *args, **kwargs):
+        return await self.request('get', *args, **kwargs)
+
+    async def post(self, *args, **kwargs):
+        return await self.request('post', *args, **kwargs)
+
+    async def put(self, *args, **kwargs):
+        return await self.request('put', *args, **kwargs)
+
+
+class AsyncTempo(AsyncApi):
+    base_url = ConfigValue('tempo', 'api_url')
+
+    worklogs_query = Tempo.worklogs_query
+
+    def __init__(self, token, **kwargs):
+        super().__init__(token, **kwargs)
+        self._author = None
+
+    @returns(models.Worklogs)
+    async def worklogs(
+        self,
+        account_id: str = None,
+        from_date: DateType = None,
+        to_date: DateType = None,
+        updated_from: DateType = None,
+        offset=0,
+        limit=200
+    ) -> models.Worklogs:
+        url, params = self.worklogs_query(
+            account_id, from_date, to_date, updated_from, offset, limit
+        )
+        return await self.get(url, params=params)
+
+    @returns(models.UserSchedules)
+    async def user_schedules(
+        self,
+        account_id: str = None,
+        from_date: DateType = None,
+        to_date: DateType = None,
+    ) -> models.UserSchedules:
+        if account_id:
+            url = f'/core/3/user-schedule/{account_id}'
+        else:
+            url = '/core/3/user-schedule'
+        return await self.get(
+            url,
+            params={
+                'from': from_date,
+                'to': to_date,
+            }
+        )
+
+    async def author_account_id(self) -> str:
+        '''
+            The account of the token owner, looked up through Jira once
+            per client and shared by concurrent writes.
+        '''
+        if self._author is None:
+            self._author = asyncio.ensure_future(self.resolve_author())
+        try:
+            return await self._author
+        except Exception:
+            self._author = None
+            raise
+
+    async def resolve_author(self) -> str:
+        jira = await AsyncJira.auth_by_tempo(self)
+        return (await jira.myself()).account_id
+
+    @returns(models.Worklog)
+    async def update_worklog(
+        self,
+        worklog_id: int = None,
+        description: str = '',
+        issue_key: str = '',
+        time_spent: int = 0,
+        billable: int = 0,
+        remaining_estimate: int = 0,
+        started: datetime.datetime = None,
+        author_account_id: str = None,
+        attributes: list = None
+    ):
+        if attributes is None:
+            attributes = []
+        if author_account_id is None:
+            author_account_id = await self.author_account_id()
+        if started is None:
+            started = datetime.datetime.now()
+        data = worklog_payload(
+            description=description,
+            issue_key=issue_key,
+            time_spent=time_spent,
+            billable=billable,
+            remaining_estimate=remaining_estimate,
+            started=started,
+            author_account_id=author_account_id,
+            attributes=attributes,
+        )
+        if worklog_id is not None:
+            return await self.put(
+                f'/core/3/worklogs/{worklog_id}',
+                json=data,
+            )
+        return await self.post('/core/3/worklogs', json=data)
+
+    create_worklog = update_worklog
+
+
+class AsyncJira(AsyncApi):
+    base_url = ConfigValue('jira', 'url')
+
+    def __init__(self, token, expires, tempo, **kwargs):
+        super().__init__(token, **kwargs)
+        self.tempo = tempo
+        self.expires = expires
+
+    @classmethod
+    async def auth_by_tempo(cls, tempo: AsyncTempo):
+        token_request = await tempo.get(
+            '/jira/v1/get-jira-oauth-token/',
+            prefix=None
+        )
+        return cls(
+            token_request['token'],
+            expires=token_request['expiresAt'],
+            tempo=tempo,
+            session=tempo.session,
+            timeout=tempo.timeout,
+            max_retries=tempo.max_retries,
+            backoff_factor=tempo.backoff_factor,
+        )
+
+    @returns(models.JiraUser)
+    async def myself(self) -> models.JiraUser:
+        return await self.get('/rest/api/3/myself')
+
+    @returns(models.Issue)
+    async def issue(self, key):
+        return await self.get(f'/rest/api/3/issue/{key}')
+
+    @returns(models.IssuePickerSections)
+    async def issue_picker(self, search):
+        params = {
+            'currentJQL': (
+                'project in projectsWhereUserHasPermission("Work on issues")'
+            ),
+            'query': search,
+            'showSubTaskParent': 'true',
+            'showSubTasks': 'true',
+        }
+        return await self.get('/rest/api/3/issue/picker', params=params)
@@ -1,33 +1,102 @@
 
 import datetime
-import requests
+import hashlib
 import logging
-from typing import Union
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Union
 from urllib.parse import urljoin
 
-from tempo.config import config
+from tempo.config import config, as_bool, ConfigValue
 from tempo.api import models
+from tempo.api.http_cache import get_default_cache
+from tempo.api.tokens import JiraTokenManager
+from tempo.api.issues import IssueResolver
 from tempo.api.models import DATE_FORMAT, TIME_FORMAT
-from tempo.api.decorators import returns, api_request
+from tempo.api.decorators import returns, api_request, invalidate
+from tempo.api.metrics import metrics, endpoint
 
 logger = logging.getLogger(__name__)
 
 DateType = Union[datetime.date, datetime.date]
 
 
+def worklog_payload(
+    description: str,
+    issue_key: str,
+    time_spent: int,
+    billable: int,
+    remaining_estimate: int,
+    started: datetime.datetime,
+    author_account_id: str,
+    attributes: list,
+) -> dict:
+    return {
+        "issueKey": issue_key,
+        "timeSpentSeconds": time_spent,
+        "billableSeconds": billable,
+        "startDate": started.strftime(DATE_FORMAT),
+        "startTime": started.strftime(TIME_FORMAT),
+        "description": description,
+        "authorAccountId": author_account_id,
+        "remainingEstimateSeconds": remaining_estimate,
+        "attributes": attributes,
+    }
+
+
+def response_size(response, stream: bool) -> int:
+    '''
+        Bytes received for the body. Streamed bodies are not read here,
+        so only their Content-Length is known.
+    '''
+    length = response.headers.get('Content-Length')
+    if length is not None and length.isdigit():
+        return int(length)
+    if stream:
+        return 0
+    return len(response.content)
+
+
+def response_retries(response) -> int:
+    retries = getattr(getattr(response, 'raw', None), 'retries', None)
+    return len(getattr(retries, 'history', ()))
+
+
 class Api:
     class ApiError(Exception):
-        def __init__(self, original, error):
+        def __init__(self, original, error, status_code=None):
             self.original = original
             self.error = error
+            if status_code is None:
+                response = getattr(original, 'response', None)
+                status_code = getattr(response, 'status_code', None)
+            self.status_code = status_code
             super().__init__(str(original))
 
     headers = {}
+    service = 'api'
 
-    def __init__(self, token):
-        self.headers = {
-            'Authorization': f'Bearer {token}'
-        }
+    def __init__(self, token, session=None, timeout=None, http_cache=None):
+        self.set_token(token)
+        self.identity = (
+            hashlib.sha256(token.encode()).hexdigest() if token else None
+        )
+        if http_cache is None and as_bool(config.http.disk_cache):
+            http_cache = get_default_cache()
+        self.http_cache = http_cache
+        if session is None:
+            from tempo.api.session import create_session
+            session = create_session(
+                pool_size=int(config.http.pool_size),
+                max_retries=int(config.http.max_retries),
+                backoff_factor=float(config.http.backoff_factor),
+                keep_alive=as_bool(config.http.keep_alive),
+            )
+        self.session = session
+        if timeout is None:
+            timeout = float(config.http.timeout)
+        self.timeout = timeout
 
     def request(
         self,
@@ -35,8 +104,14 @@ class Api:
         path,
         params={},
         json=None,
-        prefix=None
+        prefix=None,
+        stream=False,
     ):
+        '''
+            With stream the response is returned unread, so the caller
+            can consume the body incrementally. Streamed requests bypass
+            the disk cache.
+        '''
         formatted_params = {
             key: self.format_param(value)
             for key, value in params.items()
@@ -44,20 +119,79 @@ class Api:
         }
         url = urljoin(self.base_url, path)
         logger.info(
-            f'Making {method} request to {url} with params {formatted_params}'
+            'Making %s request to %s with params %s',
+            method, url, formatted_params,
         )
-        r = getattr(requests, method)(
-            url,
-            headers=self.headers,
-            params=formatted_params,
-            json=json,
+        headers = self.headers
+        key = endpoint(self.service, method, path)
+        cache_key = entry = None
+        ttl = None
+        if self.http_cache is not None and method == 'get' and not stream:
+            ttl = self.http_cache.ttl_for(path)
+        if ttl is not None:
+            cache_key = self.http_cache.key(
+                self.identity, url, formatted_params, path
+            )
+            entry = self.http_cache.get(cache_key)
+            if entry is not None:
+                if self.http_cache.is_fresh(entry):
+                    metrics.record_cache_hit(key)
+                    return entry['body']
+                headers = dict(
+                    headers, **self.http_cache.conditional_headers(entry)
+                )
+        started = time.perf_counter()
+        try:
+            r = self.session.request(
+                method,
+                url,
+                headers=headers,
+                params=formatted_params,
+                json=json,
+                timeout=self.timeout,
+                stream=stream,
+            )
+        except Exception:
+            metrics.record_request(
+                key, time.perf_counter() - started, error=True
+            )
+            raise
+        metrics.record_request(
+            key,
+            time.perf_counter() - started,
+            size=response_size(r, stream),
+            retries=response_retries(r),
+            error=r.status_code >= 400,
+            revalidated=entry is not None and r.status_code == 304,
         )
+        if entry is not None and r.status_code == 304:
+            self.http_cache.touch(cache_key, entry)
+            return entry['body']
         try:
             r.raise_for_status()
         except Exception as e:
             logger.exception('Exception calling %s', r.url)
             raise self.ApiError(e, r.text)
-        return r.json()
+        if stream:
+            return r
+        data = r.json()
+        if cache_key is not None:
+            self.http_cache.set(
+                cache_key,
+                path,
+                data,
+                ttl,
+                etag=r.headers.get('ETag'),
+                last_modified=r.headers.get('Last-Modified'),
+            )
+        elif self.http_cache is not None and method != 'get':
+            self.http_cache.invalidate_after_write(path)
+        return data
+
+    def set_token(self, token):
+        self.headers = {
+            'Authorization': f'Bearer {token}'
+        }
 
     def get(self, *args, **kwargs):
         return self.request('get', *args, **kwargs)
@@ -75,10 +209,35 @@ class Api:
 
 
 class Tempo(Api):
-    base_url = config.tempo.api_url
+    base_url = ConfigValue('tempo', 'api_url')
+    service = 'tempo'
+
+    def __init__(self, *args, reauthenticate=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.jira_tokens = JiraTokenManager(self)
+        self.reauthenticate = reauthenticate
+        self.auth_lock = threading.Lock()
+
+    def request(self, *args, **kwargs):
+        '''
+            When the access token is rejected and a reauthenticate
+            callable was given, get a new token from it and retry once.
+        '''
+        headers = self.headers
+        try:
+            return super().request(*args, **kwargs)
+        except self.ApiError as e:
+            if e.status_code != 401 or self.reauthenticate is None:
+                raise
+            with self.auth_lock:
+                if self.headers is headers:
+                    logger.info('Tempo token was rejected, authenticating')
+                    self.set_token(self.reauthenticate())
+            return super().request(*args, **kwargs)
 
     @classmethod
     def matching_instances(cls, part: str) -> str:
+        import requests
         r = requests.get(
             urljoin(config.tempo.url, 'rest/jira/client/search/'),
             params={'sitename': part}
@@ -102,22 +261,122 @@ class Tempo(Api):
         offset=0,
         limit=200
     ) -> models.Worklogs:
+        return self.get(*self.worklogs_query(
+            account_id, from_date, to_date, updated_from, offset, limit
+        ))
+
+    def stream_worklogs(
+        self,
+        account_id: str = None,
+        from_date: DateType = None,
+        to_date: DateType = None,
+        updated_from: DateType = None,
+        offset=0,
+        limit=1000,
+    ) -> models.StreamedList:
+        '''
+            Like worklogs, but worklogs are decoded one at a time while
+            the response is downloaded instead of after reading it whole.
+        '''
+        r = self.get(
+            *self.worklogs_query(
+                account_id, from_date, to_date, updated_from, offset, limit
+            ),
+            stream=True,
+        )
+        return models.StreamedList(
+            models.Worklog,
+            r.iter_content(chunk_size=64 * 1024),
+            close=r.close,
+        )
+
+    def worklogs_query(
+        self, account_id, from_date, to_date, updated_from, offset, limit
+    ):
         if account_id:
             url = f'/core/3/worklogs/account/{account_id}'
         else:
             url = '/core/3/worklogs'
-        return self.get(
-            url,
-            params={
-                'from': from_date,
-                'to': to_date,
-                'updated_from': updated_from,
-                'offset': offset,
-                'limit': limit,
-            }
-        )
+        return url, {
+            'from': from_date,
+            'to': to_date,
+            'updatedFrom': updated_from,
+            'offset': offset,
+            'limit': limit,
+        }
+
+    def iter_worklogs(
+        self,
+        account_id: str = None,
+        from_date: DateType = None,
+        to_date: DateType = None,
+        updated_from: DateType = None,
+        limit=200,
+        prefetch=False,
+        stream=False,
+    ) -> Iterator[models.Worklog]:
+        '''
+            Yield worklogs one page at a time, following the pagination
+            metadata until the last page. With prefetch the next page is
+            requested in the background while the current one is consumed.
+            With stream each page is decoded while it downloads, pages
+            are then fetched one after the other.
+        '''
+        if stream:
+            offset = 0
+            while True:
+                page = self.stream_worklogs(
+                    account_id=account_id,
+                    from_date=from_date,
+                    to_date=to_date,
+                    updated_from=updated_from,
+                    offset=offset,
+                    limit=limit,
+                )
+                yield from page
+                metadata = page.metadata
+                if metadata is None or not (
+                    bool(metadata.next) or metadata.count >= limit
+                ):
+                    return
+                offset += metadata.limit or limit
+
+        def fetch(offset):
+            return self.worklogs(
+                account_id=account_id,
+                from_date=from_date,
+                to_date=to_date,
+                updated_from=updated_from,
+                offset=offset,
+                limit=limit,
+            )
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            offset = 0
+            page = fetch(offset)
+            while True:
+                metadata = page.metadata
+                has_more = metadata is not None and (
+                    bool(metadata.next) or metadata.count >= limit
+                )
+                if has_more:
+                    offset += metadata.limit or limit
+                    if executor:
+                        pending = executor.submit(fetch, offset)
+                yield from page
+                if not has_more:
+                    break
+                page = pending.result() if executor else fetch(offset)
+        finally:
+            if executor:
+                executor.shutdown(wait=False)
 
-    @api_request(cache=True)
+    @api_request
+    def all_worklogs(self, **kwargs) -> List[models.Worklog]:
+        return list(self.iter_worklogs(**kwargs))
+
+    @api_request(cache=True, ttl=10 * 60)
     @returns(models.UserSchedules)
     def user_schedules(
         self,
@@ -137,7 +396,7 @@ class Tempo(Api):
             }
         )
 
-    @api_request
+    @api_request(coalesce=False)
     @returns(models.Worklog)
     def update_worklog(
         self,
@@ -155,51 +414,86 @@ class Tempo(Api):
             attributes = []
         if author_account_id is None:
             jira = Jira.auth_by_tempo(self)
-            author_account_id = jira.myself()['accountId']
+            author_account_id = jira.myself().account_id
         if started is None:
             started = datetime.datetime.now()
-        data = {
-            "issueKey": issue_key,
-            "timeSpentSeconds": time_spent,
-            "billableSeconds": billable,
-            "startDate": started.strftime(DATE_FORMAT),
-            "startTime": started.strftime(TIME_FORMAT),
-            "description": description,
-            "authorAccountId": author_account_id,
-            "remainingEstimateSeconds": remaining_estimate,
-            "attributes": attributes,
-        }
+        data = worklog_payload(
+            description=description,
+            issue_key=issue_key,
+            time_spent=time_spent,
+            billable=billable,
+            remaining_estimate=remaining_estimate,
+            started=started,
+            author_account_id=author_account_id,
+            attributes=attributes,
+        )
         if worklog_id is not None:
-            return self.put(
+            result = self.put(
                 f'/core/3/worklogs/{worklog_id}',
                 json=data,
             )
-        return self.post(f'/core/3/worklogs', json=data)
+        else:
+            result = self.post(f'/core/3/worklogs', json=data)
+        invalidate(
+            Tempo.worklogs, Tempo.all_worklogs, Jira.issue, instance=self
+        )
+        return result
 
     create_worklog = update_worklog
 
 
 class Jira(Api):
-    base_url = config.jira.url
+    base_url = ConfigValue('jira', 'url')
+    service = 'jira'
 
-    def __init__(self, token, expires, tempo):
-        super().__init__(token)
+    def __init__(
+        self,
+        token,
+        expires,
+        tempo,
+        session=None,
+        timeout=None,
+        http_cache=None,
+        token_manager=None,
+    ):
+        super().__init__(
+            token, session=session, timeout=timeout, http_cache=http_cache
+        )
         self.tempo = tempo
         self.expires = expires
+        self.token_manager = token_manager
+        self.issue_resolver = IssueResolver(self)
+        # Jira tokens are short lived, cache entries follow the Tempo user
+        self.identity = tempo.identity
+
+    def request(self, *args, **kwargs):
+        if self.token_manager is None:
+            return super().request(*args, **kwargs)
+        self.set_token(self.token_manager.get())
+        try:
+            return super().request(*args, **kwargs)
+        except self.ApiError as e:
+            if e.status_code != 401:
+                raise
+            logger.info('Jira token was rejected, fetching a new one')
+            self.set_token(self.token_manager.refresh())
+            return super().request(*args, **kwargs)
 
     @classmethod
     def auth_by_tempo(cls, tempo: Tempo):
-        token_request = tempo.get(
-            '/jira/v1/get-jira-oauth-token/',
-            prefix=None
-        )
+        # The token is fetched by the first request, not up front.
+        manager = tempo.jira_tokens
         return cls(
-            token_request['token'],
-            expires=token_request['expiresAt'],
-            tempo=tempo
+            None,
+            expires=manager.expires_at,
+            tempo=tempo,
+            token_manager=manager,
+            session=tempo.session,
+            timeout=tempo.timeout,
+            http_cache=tempo.http_cache,
         )
 
-    @api_request(cache=True)
+    @api_request(cache=True, ttl=60 * 60)
     @returns(models.JiraUser)
     def myself(self) -> models.JiraUser:
         return self.get('/rest/api/3/myself')
@@ -209,6 +503,18 @@ class Jira(Api):
     def issue(self, key):
         return self.get(f'/rest/api/3/issue/{key}')
 
+    @api_request
+    @returns(models.IssueSearchResults)
+    def search(self, jql, fields=None, max_results=50, start_at=0):
+        params = {
+            'jql': jql,
+            'fields': ','.join(fields) if fields else None,
+            'maxResults': max_results,
+            'startAt': start_at,
+            'validateQuery': 'warn',
+        }
+        return self.get('/rest/api/3/search', params=params)
+
     @api_request
     @returns(models.IssuePickerSections)
     def issue_picker(self, search):
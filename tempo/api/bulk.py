@@ -0,0 +1,130 @@
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Iterable, Iterator
+
+from tempo.api.api import Tempo, Jira
+
+logger = logging.getLogger(__name__)
+
+
+class BulkResult:
+    def __init__(self, index: int, item: dict, worklog=None, error=None):
+        self.index = index
+        self.item = item
+        self.worklog = worklog
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = 'ok' if self.ok else f'error={self.error!r}'
+        return f'<BulkResult {self.index} {status}>'
+
+
+class Journal:
+    '''
+        Append-only record of the input rows that were written, so an
+        interrupted run can be resumed without creating duplicates.
+    '''
+    def __init__(self, path: str):
+        self.path = path
+        self.done = set()
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        self.done.add(json.loads(line)['index'])
+
+    def __contains__(self, index):
+        return index in self.done
+
+    def record(self, result: BulkResult):
+        with self.lock:
+            self.done.add(result.index)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps({
+                    'index': result.index,
+                    'worklog_id': result.worklog.id,
+                }) + '\n')
+
+
+def resolve_author(tempo: Tempo) -> str:
+    jira = Jira.auth_by_tempo(tempo)
+    return jira.myself(cache=True).account_id
+
+
+def update_worklogs(
+    tempo: Tempo,
+    items: Iterable[dict],
+    workers: int = 8,
+    author_account_id: str = None,
+    journal: str = None,
+    convert=None,
+) -> Iterator[BulkResult]:
+    '''
+        Create or update worklogs through a bounded worker pool.
+        Each item holds keyword arguments for Tempo.update_worklog, items
+        with a worklog_id are updated. convert turns raw input rows into
+        such items. Results are yielded as they complete, failures,
+        including rows that cannot be converted, are reported per item
+        instead of aborting the run. Rows recorded in the journal file
+        are skipped. The author is looked up at most once, if that
+        fails every item without an author fails with the same error.
+    '''
+    done = Journal(journal) if journal else None
+    author_error = None
+
+    def author():
+        nonlocal author_account_id, author_error
+        if author_account_id is None and author_error is None:
+            try:
+                author_account_id = resolve_author(tempo)
+            except Exception as e:
+                author_error = e
+        if author_error is not None:
+            raise author_error
+        return author_account_id
+
+    def failed(index, item, e):
+        logger.warning('Bulk item %s failed: %s', index, e)
+        return BulkResult(
+            index, item, error=getattr(e, 'error', None) or str(e)
+        )
+
+    def submit(index, item):
+        try:
+            worklog = tempo.update_worklog(**item)
+        except Exception as e:
+            return failed(index, item, e)
+        result = BulkResult(index, item, worklog=worklog)
+        if done is not None:
+            done.record(result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for index, item in enumerate(items):
+            if done is not None and index in done:
+                continue
+            try:
+                item = dict(convert(item) if convert else item)
+                if item.get('author_account_id') is None:
+                    item['author_account_id'] = author()
+            except Exception as e:
+                yield failed(index, item, e)
+                continue
+            pending.add(executor.submit(submit, index, item))
+            if len(pending) >= workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    yield future.result()
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield future.result()
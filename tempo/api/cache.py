@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class LRUCache:
+    '''
+        Thread safe mapping with a size cap and optional per-entry TTL.
+        The least recently used entry is evicted when the cache is full.
+    '''
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return self.get(key, count=False) is not MISSING
+
+    def get(self, key, default=MISSING, count=True):
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or expires > time.monotonic():
+                    self.data.move_to_end(key)
+                    if count:
+                        self.hits += 1
+                    return value
+                del self.data[key]
+            if count:
+                self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float = None):
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self.lock:
+            self.data[key] = (expires, value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, predicate=None) -> int:
+        '''
+            Remove every entry whose key matches predicate,
+            or all entries when no predicate is given.
+        '''
+        with self.lock:
+            if predicate is None:
+                removed = len(self.data)
+                self.data.clear()
+                return removed
+            keys = [key for key in self.data if predicate(key)]
+            for key in keys:
+                del self.data[key]
+            return len(keys)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'size': len(self.data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
@@ -1,13 +1,25 @@
 import functools
-import uuid
+import inspect
 import threading
 import logging
+from concurrent.futures import Future
+
+from tempo.api.cache import LRUCache, MISSING
+from tempo.api.executor import get_executor
+from tempo.api.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
 
 def returns(_type):
     def wrapper(f):
+        if inspect.iscoroutinefunction(f):
+            @functools.wraps(f)
+            async def async_inner(*args, **kwargs):
+                data = await f(*args, **kwargs)
+                return _type(data)
+            return async_inner
+
         @functools.wraps(f)
         def inner(*args, **kwargs):
             data = f(*args, **kwargs)
@@ -16,39 +28,176 @@ def returns(_type):
     return wrapper
 
 
-mem_cache = {}
+result_cache = LRUCache(maxsize=512)
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def cache_key(f, signature, args, kwargs):
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+    instance = arguments.pop('self', None)
+    client = getattr(instance, 'identity', None) or id(instance)
+    return (f.__qualname__, client, freeze(arguments))
+
+
+def invalidate(*methods, instance=None):
+    '''
+        Drop cached results of the given api_request methods,
+        optionally only those made by one client.
+    '''
+    names = {method.__qualname__ for method in methods}
+    client = getattr(instance, 'identity', None) or id(instance)
+
+    def matches(key):
+        if methods and key[0] not in names:
+            return False
+        return instance is None or key[1] == client
+    return result_cache.invalidate(matches)
+
 
+class InFlight:
+    '''
+        Tracks calls that are currently running so that identical
+        concurrent calls can wait for the first one instead of making
+        their own request.
+    '''
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.futures = {}
+        self.waiters = {}
 
-class RestRequestThread(threading.Thread):
-    def __init__(self, f, callback, *args, **kwargs):
-        self.callback = callback
-        self.f = f
-        self.kwargs = kwargs
-        self.args = args
-        super().__init__()
-        self.start()
+    def join(self, key):
+        '''
+            Returns (future, leader). The leader must call finish,
+            or abandon if it never ran.
+        '''
+        with self.lock:
+            future = self.futures.get(key)
+            if future is not None:
+                self.waiters[key] += 1
+                return future, False
+            future = self.futures[key] = Future()
+            self.waiters[key] = 0
+            return future, True
 
-    def run(self):
-        self.callback(self.f(*self.args, **self.kwargs))
+    def abandon(self, key, future) -> bool:
+        '''
+            Give up a call whose leader was cancelled before it ran.
+            Returns False if other callers are waiting for it.
+        '''
+        with self.lock:
+            if self.waiters.get(key):
+                return False
+            self.futures.pop(key, None)
+            self.waiters.pop(key, None)
+        future.cancel()
+        return True
 
+    def finish(self, key, future, result=None, exception=None):
+        with self.lock:
+            self.futures.pop(key, None)
+            self.waiters.pop(key, None)
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
 
-def api_request(original_function=None, cache=False):
-    method_uuid = str(uuid.uuid4())
+    def __len__(self):
+        return len(self.futures)
 
+
+in_flight = InFlight()
+
+
+def api_request(original_function=None, cache=False, ttl=None, coalesce=True):
+    '''
+        cache: reuse results of earlier identical calls for ttl seconds.
+        coalesce: identical calls made while one is in flight wait for it
+        and share its result. Disable for calls that are not idempotent.
+
+        Calls made with callback= run on the shared background executor
+        and return a future. Failures go to error_callback, and a newer
+        call with the same supersede key replaces an older one.
+    '''
     def decorate(f):
+        signature = inspect.signature(f)
 
         @functools.wraps(f)
-        def wrapper(*args, cache=cache, callback=None, **kwargs):
-            cache_key = f'{method_uuid}_{str(kwargs)}'
-            if cache and cache_key in mem_cache:
-                return mem_cache[cache_key]
-            if callback:
-                RestRequestThread(f, callback, *args, **kwargs)
-            else:
-                result = f(*args, **kwargs)
+        def wrapper(
+            *args,
+            cache=cache,
+            callback=None,
+            error_callback=None,
+            supersede=None,
+            **kwargs
+        ):
+            key = None
+            if cache or coalesce:
+                key = cache_key(f, signature, args, kwargs)
+            if cache:
+                result = result_cache.get(key)
+                metrics.record_call(f.__qualname__, hit=result is not MISSING)
+                if result is not MISSING:
+                    if callback:
+                        if supersede is not None:
+                            get_executor().cancel(supersede)
+                        callback(result)
+                    return result
+            if coalesce:
+                future, leader = in_flight.join(key)
+                if not leader:
+                    metrics.record_call(f.__qualname__, coalesced=True)
+                    if callback:
+                        get_executor().watch(
+                            future,
+                            callback=callback,
+                            error_callback=error_callback,
+                            supersede=supersede,
+                        )
+                        return future
+                    return future.result()
+
+            def call():
+                try:
+                    result = f(*args, **kwargs)
+                except BaseException as e:
+                    if coalesce:
+                        in_flight.finish(key, future, exception=e)
+                    raise
                 if cache:
-                    mem_cache[cache_key] = result
+                    result_cache.set(key, result, ttl=ttl)
+                if coalesce:
+                    in_flight.finish(key, future, result)
                 return result
+
+            if callback:
+                background = get_executor().submit(
+                    call,
+                    callback=callback,
+                    error_callback=error_callback,
+                    supersede=supersede,
+                )
+                if coalesce:
+                    def cancelled(background):
+                        if background.cancelled():
+                            if not in_flight.abandon(key, future):
+                                get_executor().submit(call)
+                    background.add_done_callback(cancelled)
+                return background
+            return call()
+
+        def invalidate_cache(instance=None):
+            return invalidate(wrapper, instance=instance)
+
+        wrapper.invalidate = invalidate_cache
         return wrapper
 
     if original_function:
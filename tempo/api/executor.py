@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from tempo.config import config
+from tempo.api.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RequestExecutor:
+    '''
+        Bounded pool for background requests.
+        Work submitted with a supersede key replaces earlier work with the
+        same key: queued work is cancelled and results of work that was
+        already running are dropped, so only the latest request calls back.
+    '''
+    def __init__(self, max_workers: int = 8):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='tempo-request',
+        )
+        self.lock = threading.Lock()
+        self.latest = {}
+        self.queued = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self.queued
+
+    def run(self, fn, args, kwargs, submitted):
+        with self.lock:
+            self.queued -= 1
+        metrics.record_queue_wait(time.monotonic() - submitted)
+        return fn(*args, **kwargs)
+
+    def submit(
+        self,
+        fn,
+        *args,
+        callback=None,
+        error_callback=None,
+        supersede=None,
+        **kwargs
+    ) -> Future:
+        with self.lock:
+            self.queued += 1
+            future = self.executor.submit(
+                self.run, fn, args, kwargs, time.monotonic()
+            )
+        future.add_done_callback(self.unqueue_cancelled)
+        self.watch(
+            future,
+            callback=callback,
+            error_callback=error_callback,
+            supersede=supersede,
+            cancellable=True,
+        )
+        return future
+
+    def unqueue_cancelled(self, future):
+        if future.cancelled():
+            with self.lock:
+                self.queued -= 1
+
+    def watch(
+        self,
+        future: Future,
+        callback=None,
+        error_callback=None,
+        supersede=None,
+        cancellable=False,
+    ):
+        '''
+            Call back when a future that is not ours finishes,
+            honouring supersede keys.
+        '''
+        if supersede is not None:
+            with self.lock:
+                previous = self.latest.get(supersede)
+                self.latest[supersede] = (future, cancellable)
+            if previous is not None and previous[1]:
+                previous[0].cancel()
+
+        def done(future):
+            if supersede is not None:
+                with self.lock:
+                    current = self.latest.get(supersede)
+                    if current is None or current[0] is not future:
+                        logger.debug('Dropping superseded %s', supersede)
+                        return
+                    del self.latest[supersede]
+            if future.cancelled():
+                return
+            exception = future.exception()
+            if exception is not None:
+                if error_callback:
+                    error_callback(exception)
+                else:
+                    logger.error(
+                        'Background request failed', exc_info=exception
+                    )
+            elif callback:
+                callback(future.result())
+        future.add_done_callback(done)
+
+    def cancel(self, supersede) -> bool:
+        with self.lock:
+            current = self.latest.pop(supersede, None)
+        if current is not None and current[1]:
+            return current[0].cancel()
+        return False
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+
+default_executor = None
+executor_lock = threading.Lock()
+
+
+def get_executor() -> RequestExecutor:
+    global default_executor
+    with executor_lock:
+        if default_executor is None:
+            default_executor = RequestExecutor(
+                max_workers=int(config.http.background_workers)
+            )
+    return default_executor
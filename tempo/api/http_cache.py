@@ -0,0 +1,214 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from urllib.parse import quote, unquote
+
+from appdirs import user_cache_dir
+
+from tempo.config import config
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.join(user_cache_dir(appname='tempo'), 'http')
+
+# Paths matching these patterns are cached for the given number of seconds.
+DEFAULT_TTLS = [
+    (r'^/rest/api/3/myself', 24 * 60 * 60),
+    (r'^/core/3/user-schedule', 60 * 60),
+    (r'^/rest/api/3/issue/(?!picker$)[^/]+$', 10 * 60),
+]
+
+# Writes to a path matching the pattern invalidate the listed path prefixes.
+DEFAULT_INVALIDATIONS = [
+    (r'^/core/3/worklogs', ['/core/3/worklogs']),
+]
+
+
+class DiskCache:
+    '''
+        Stores GET responses as one JSON file per request. Entries past
+        their TTL are revalidated with ETag/Last-Modified when the server
+        sent them, and the oldest entries are evicted once the directory
+        grows beyond max_bytes.
+    '''
+    def __init__(
+        self,
+        directory: str = CACHE_DIR,
+        max_bytes: int = 50 * 1024 * 1024,
+        ttls: list = None,
+        invalidations: list = None,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttls = [
+            (re.compile(pattern), ttl)
+            for pattern, ttl in (DEFAULT_TTLS if ttls is None else ttls)
+        ]
+        self.invalidations = [
+            (re.compile(pattern), prefixes)
+            for pattern, prefixes in (
+                DEFAULT_INVALIDATIONS if invalidations is None
+                else invalidations
+            )
+        ]
+        self.index = None
+
+    def ttl_for(self, path: str):
+        for pattern, ttl in self.ttls:
+            if pattern.match(path):
+                return ttl
+        return None
+
+    def key(
+        self, identity: str, url: str, params: dict, path: str = None
+    ) -> str:
+        '''
+            With path, the key starts with the quoted path so that
+            invalidation can match entries by file name alone.
+        '''
+        raw = json.dumps([identity, url, sorted(params.items())], default=str)
+        digest = hashlib.sha256(raw.encode()).hexdigest()
+        if path is None:
+            return digest
+        return f'{quote(path, safe="")[:100]}@{digest}'
+
+    def filename(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key: str):
+        try:
+            with open(self.filename(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: dict) -> bool:
+        return entry['stored_at'] + entry['ttl'] > time.time()
+
+    def conditional_headers(self, entry: dict) -> dict:
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def set(
+        self,
+        key: str,
+        path: str,
+        body,
+        ttl: float,
+        etag: str = None,
+        last_modified: str = None,
+    ):
+        self.write(key, {
+            'path': path,
+            'stored_at': time.time(),
+            'ttl': ttl,
+            'etag': etag,
+            'last_modified': last_modified,
+            'body': body,
+        })
+        self.prune()
+
+    def touch(self, key: str, entry: dict):
+        entry['stored_at'] = time.time()
+        self.write(key, entry)
+
+    def write(self, key: str, entry: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp, self.filename(key))
+            if self.index is not None:
+                self.index.add(f'{key}.json')
+        except OSError:
+            logger.exception('Could not write cache entry %s', key)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def entries(self):
+        try:
+            return [
+                entry for entry in os.scandir(self.directory)
+                if entry.name.endswith('.json')
+            ]
+        except FileNotFoundError:
+            return []
+
+    def prune(self):
+        entries = self.entries()
+        total = sum(entry.stat().st_size for entry in entries)
+        if total <= self.max_bytes:
+            return
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            total -= entry.stat().st_size
+            self.remove(entry.path)
+            if total <= self.max_bytes:
+                break
+
+    def names(self) -> set:
+        '''
+            File names of the entries, listed once and then kept up to
+            date by this instance.
+        '''
+        if self.index is None:
+            self.index = {entry.name for entry in self.entries()}
+        return self.index
+
+    def remove(self, filename: str):
+        if self.index is not None:
+            self.index.discard(os.path.basename(filename))
+        try:
+            os.remove(filename)
+        except FileNotFoundError:
+            pass
+
+    def invalidate(self, prefixes: list = None):
+        '''
+            Remove entries whose path starts with one of prefixes,
+            or every entry if no prefixes are given.
+        '''
+        if prefixes is None:
+            for entry in self.entries():
+                self.remove(entry.path)
+            return
+        for name in list(self.names()):
+            path = self.entry_path(name)
+            if any(path.startswith(prefix) for prefix in prefixes):
+                self.remove(os.path.join(self.directory, name))
+
+    def entry_path(self, name: str) -> str:
+        key = name[:-len('.json')]
+        if '@' in key:
+            return unquote(key.rsplit('@', 1)[0])
+        # Keys made without a path, read the entry.
+        try:
+            with open(os.path.join(self.directory, name)) as f:
+                return json.load(f)['path']
+        except (OSError, ValueError, KeyError):
+            return ''
+
+    def invalidate_after_write(self, path: str):
+        for pattern, prefixes in self.invalidations:
+            if pattern.match(path):
+                self.invalidate(prefixes)
+
+
+default_cache = None
+
+
+def get_default_cache() -> DiskCache:
+    global default_cache
+    if default_cache is None:
+        default_cache = DiskCache(
+            max_bytes=int(config.http.disk_cache_max_bytes)
+        )
+    return default_cache
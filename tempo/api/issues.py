@@ -0,0 +1,56 @@
+import logging
+from typing import Dict, Iterable
+
+from tempo.api.cache import LRUCache, MISSING
+
+logger = logging.getLogger(__name__)
+
+
+class IssueResolver:
+    '''
+        Resolves issue details for many keys at once with chunked
+        "key in (...)" searches, caching the results by key.
+        Keys that Jira does not return are cached as None.
+    '''
+    def __init__(
+        self,
+        jira,
+        ttl: float = 10 * 60,
+        chunk_size: int = 50,
+        fields: Iterable[str] = ('summary', 'status'),
+        maxsize: int = 2048,
+    ):
+        self.jira = jira
+        self.ttl = ttl
+        self.chunk_size = chunk_size
+        self.fields = list(fields)
+        self.cache = LRUCache(maxsize=maxsize)
+
+    def get(self, key: str):
+        value = self.cache.get(key)
+        return None if value is MISSING else value
+
+    def missing(self, keys: Iterable[str]) -> list:
+        unique = []
+        for key in keys:
+            if key not in unique and key not in self.cache:
+                unique.append(key)
+        return unique
+
+    def resolve(self, keys: Iterable[str]) -> Dict[str, object]:
+        keys = list(keys)
+        missing = self.missing(keys)
+        for start in range(0, len(missing), self.chunk_size):
+            chunk = missing[start:start + self.chunk_size]
+            jql = 'key in ({})'.format(
+                ', '.join(f'"{key}"' for key in chunk)
+            )
+            found = {
+                issue.key: issue
+                for issue in self.jira.search(
+                    jql, fields=self.fields, max_results=len(chunk)
+                )
+            }
+            for key in chunk:
+                self.cache.set(key, found.get(key), ttl=self.ttl)
+        return {key: self.get(key) for key in keys}
@@ -0,0 +1,171 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+
+# Path segments that identify one resource rather than an endpoint:
+# numeric ids, issue keys and account ids. Single digits are API versions.
+ID_SEGMENT = re.compile(
+    r'^(\d{2,}|[A-Z][A-Z0-9_]+-\d+|[0-9a-f]{12,}|[0-9a-z]+:[0-9a-f-]+)$'
+)
+SAMPLES = 2048
+
+
+def endpoint(service: str, method: str, path: str) -> str:
+    '''
+        Group requests to the same resource type, so that
+        /core/3/worklogs/123 and /core/3/worklogs/456 count as one
+        endpoint.
+    '''
+    path = path.split('?', 1)[0]
+    template = '/'.join(
+        '*' if ID_SEGMENT.match(segment) else segment
+        for segment in path.split('/')
+    )
+    return f'{service} {method.upper()} {template}'
+
+
+def percentile(ordered: list, fraction: float) -> float:
+    index = min(int(len(ordered) * fraction), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(samples) -> dict:
+    '''
+        Percentiles of the most recent samples, in milliseconds.
+    '''
+    ordered = sorted(samples)
+    if not ordered:
+        return {'count': 0}
+    return {
+        'count': len(ordered),
+        'mean': round(sum(ordered) / len(ordered) * 1000, 2),
+        'p50': round(percentile(ordered, 0.5) * 1000, 2),
+        'p90': round(percentile(ordered, 0.9) * 1000, 2),
+        'p99': round(percentile(ordered, 0.99) * 1000, 2),
+        'max': round(ordered[-1] * 1000, 2),
+    }
+
+
+class EndpointStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.bytes = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.revalidated = 0
+        self.latencies = deque(maxlen=SAMPLES)
+
+    def as_dict(self) -> dict:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'bytes': self.bytes,
+            'retries': self.retries,
+            'cache_hits': self.cache_hits,
+            'revalidated': self.revalidated,
+            'latency_ms': summarize(self.latencies),
+        }
+
+
+class CallStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+class Metrics:
+    '''
+        Thread safe counters for the requests made by this process.
+        Per endpoint: calls, errors, bytes received, urllib3 retries,
+        disk cache hits and latency percentiles. Per api_request method:
+        result cache hits and calls that joined one already in flight.
+        Also the time background work waited for a free worker.
+    '''
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.endpoints = defaultdict(EndpointStats)
+            self.calls = defaultdict(CallStats)
+            self.queue_waits = deque(maxlen=SAMPLES)
+
+    def record_request(
+        self,
+        key: str,
+        elapsed: float,
+        size: int = 0,
+        retries: int = 0,
+        error: bool = False,
+        revalidated: bool = False,
+    ):
+        with self.lock:
+            stats = self.endpoints[key]
+            stats.calls += 1
+            stats.bytes += size
+            stats.retries += retries
+            stats.latencies.append(elapsed)
+            if error:
+                stats.errors += 1
+            if revalidated:
+                stats.revalidated += 1
+
+    def record_cache_hit(self, key: str):
+        with self.lock:
+            self.endpoints[key].cache_hits += 1
+
+    def record_call(self, name: str, hit=False, coalesced=False):
+        with self.lock:
+            stats = self.calls[name]
+            if coalesced:
+                stats.coalesced += 1
+            elif hit:
+                stats.hits += 1
+            else:
+                stats.misses += 1
+
+    def record_queue_wait(self, elapsed: float):
+        with self.lock:
+            self.queue_waits.append(elapsed)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                'started': self.started,
+                'uptime': round(time.time() - self.started, 3),
+                'endpoints': {
+                    key: stats.as_dict()
+                    for key, stats in sorted(self.endpoints.items())
+                },
+                'calls': {
+                    name: stats.as_dict()
+                    for name, stats in sorted(self.calls.items())
+                },
+                'queue_wait_ms': summarize(self.queue_waits),
+            }
+
+    def dump(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+
+metrics = Metrics()
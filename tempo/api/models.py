@@ -1,24 +1,135 @@
 from typing import Union
 import datetime
+import operator
+
+from tempo.api import timestamps
+from tempo.api.streaming import JSONStream
+from tempo.api.timestamps import DATE_FORMAT, TIME_FORMAT, DATETIME_FORMAT
+
+
+class LazyField:
+    '''
+        Converts a field from raw_data on first access and keeps the
+        result in the slot reserved for it.
+    '''
+    __slots__ = ('field', 'slot', 'parse')
+
+    def __init__(self, field, slot, parse):
+        self.field = field
+        self.slot = slot
+        self.parse = parse
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            return self.slot.__get__(instance, owner)
+        except AttributeError:
+            value = self.parse(instance.raw_data)
+            self.slot.__set__(instance, value)
+            return value
+
+    def __set__(self, instance, value):
+        self.slot.__set__(instance, value)
+
+    def __delete__(self, instance):
+        self.slot.__delete__(instance)
+
+
+def compile_loader(slots, parsers):
+    '''
+        Build a function that converts and stores every field of a record
+        in one go, unrolled so that no per-field dispatch is left.
+    '''
+    namespace = {}
+    lines = ['def load_fields(item, data):']
+    for i, (slot, parse) in enumerate(zip(slots, parsers)):
+        namespace[f'set_{i}'] = slot.__set__
+        namespace[f'parse_{i}'] = parse
+        lines.append(f'    set_{i}(item, parse_{i}(data))')
+    if not slots:
+        lines.append('    pass')
+    exec('\n'.join(lines), namespace)
+    return namespace['load_fields']
+
+
+class ItemMeta(type):
+    '''
+        Gives each Item class a __slots__ layout derived from its fields,
+        with every field converted lazily by a parser compiled once per
+        class.
+    '''
+    def __new__(mcs, name, bases, namespace):
+        fields = namespace.get('fields')
+        if '__slots__' not in namespace:
+            namespace['__slots__'] = tuple(
+                f'_{field.name}' for field in fields or []
+            )
+        cls = super().__new__(mcs, name, bases, namespace)
+        if fields is not None:
+            slots = [cls.__dict__[f'_{field.name}'] for field in fields]
+            parsers = [field.compile() for field in fields]
+            for field, slot, parse in zip(fields, slots, parsers):
+                setattr(cls, field.name, LazyField(field, slot, parse))
+            cls.load_fields = staticmethod(compile_loader(slots, parsers))
+        return cls
 
-DATE_FORMAT = '%Y-%m-%d'
-TIME_FORMAT = '%H:%M:%S'
-DATETIME_FORMAT = f'{DATE_FORMAT}T{TIME_FORMAT}Z'
 
+class Item(metaclass=ItemMeta):
+    __slots__ = ('raw_data', 'self_link', '__weakref__')
+    fields = []
 
-class Item:
     def __init__(self, data: dict):
         self.raw_data = data
         self.self_link = data.get('self')
         self.populate(data)
 
     def populate(self, data: dict):
-        for field in self.fields:
-            setattr(self, field.name, field.value(data))
+        pass
+
+    def load(self):
+        '''
+            Convert every field now instead of on first access.
+        '''
+        self.load_fields(self, self.raw_data)
+        return self
+
+    @classmethod
+    def from_list(cls, records: list, eager: bool = False) -> list:
+        '''
+            Build items for a whole result array, skipping __init__ for
+            classes that do not customize populate.
+        '''
+        customized = (
+            cls.populate is not Item.populate
+            or cls.__init__ is not Item.__init__
+        )
+        if customized:
+            items = [cls(data) for data in records]
+            if eager:
+                for item in items:
+                    item.load()
+            return items
+        new = cls.__new__
+        set_raw_data = Item.raw_data.__set__
+        set_self_link = Item.self_link.__set__
+        load_fields = cls.load_fields
+        items = []
+        append = items.append
+        for data in records:
+            item = new(cls)
+            set_raw_data(item, data)
+            set_self_link(item, data.get('self'))
+            if eager:
+                load_fields(item, data)
+            append(item)
+        return items
 
 
 class List(Item):
+    __slots__ = ('metadata', '_items')
     result_key = 'results'
+
     def __init__(self, data: Union[dict, list]):
         if isinstance(data, dict):
             super().__init__(data)
@@ -44,20 +155,48 @@ class List(Item):
             self.metadata = Metadata(data['metadata'])
         else:
             self.metadata = None
-        self._items = [
-            web_item_type(item_data)
-            for item_data in data[self.result_key]
-        ]
-        # if isinstance(data, dict):
-        # else:
-        #     self._items = [web_item_type(item_data) for item_data in data]
+        self._items = web_item_type.from_list(data[self.result_key])
+
+
+class StreamedList:
+    '''
+        The items of a List response, converted one at a time while the
+        response is still being read. It can only be iterated once.
+        metadata is available as soon as it has been read, which for
+        Tempo is before the first item.
+    '''
+    def __init__(self, of, chunks, result_key: str = 'results', close=None):
+        self.of = of
+        self.stream = JSONStream(chunks, result_key)
+        self.close_response = close
+
+    @property
+    def metadata(self):
+        self.stream.read_members()
+        data = self.stream.members.get('metadata')
+        return None if data is None else Metadata(data)
+
+    def __iter__(self):
+        try:
+            for data in self.stream:
+                yield self.of(data)
+        finally:
+            self.close()
+
+    def close(self):
+        if self.close_response is not None:
+            self.close_response()
+            self.close_response = None
 
 
 class Metadata:
+    __slots__ = ('count', 'offset', 'limit', 'next')
+
     def __init__(self, data: dict):
         self.count = data['count']
         self.offset = data.get('offset')
         self.limit = data.get('limit')
+        self.next = data.get('next')
 
 
 class Field:
@@ -89,6 +228,33 @@ class Field:
     def convert(self, value):
         return value
 
+    def compile(self):
+        '''
+            Return a function equivalent to value() with the data key
+            lookup, the required check and the conversion resolved once.
+        '''
+        data_key = self.data_key
+        if callable(data_key):
+            get = data_key
+        elif self.required:
+            get = operator.itemgetter(data_key)
+        else:
+            def get(data):
+                return data.get(data_key)
+        if type(self).convert is Field.convert:
+            return get
+        convert = self.convert
+        if self.required:
+            def parse(data):
+                return convert(get(data))
+        else:
+            def parse(data):
+                value = get(data)
+                if value:
+                    return convert(value)
+                return value
+        return parse
+
     def optional(self):
         self.required = False
         return self
@@ -114,6 +280,8 @@ class DateTimeField(Field):
     frmt = DATETIME_FORMAT
 
     def convert(self, value):
+        if self.frmt == DATETIME_FORMAT:
+            return timestamps.parse_datetime(value)
         return datetime.datetime.strptime(value, self.frmt)
 
 
@@ -121,8 +289,22 @@ class DateField(DateTimeField):
     frmt = DATE_FORMAT
 
     def convert(self, value):
-        value = super().convert(value)
-        return value.date()
+        if self.frmt == DATE_FORMAT:
+            return timestamps.parse_date(value)
+        return super().convert(value).date()
+
+
+class CombinedDateTimeField(Field):
+    '''
+        A datetime stored as separate date and time keys.
+    '''
+    def __init__(self, name: str, date_key: str, time_key: str):
+        super().__init__(
+            name, lambda data: (data[date_key], data[time_key])
+        )
+
+    def convert(self, value):
+        return timestamps.combine(*value)
 
 
 class ArrayField(Field):
@@ -146,6 +328,23 @@ class Issue(Item):
     ]
 
 
+class IssueDetails(Item):
+    fields = [
+        Field('id'),
+        Field('key'),
+        Field('summary', lambda data: data['fields'].get('summary')),
+        Field(
+            'status',
+            lambda data: (data['fields'].get('status') or {}).get('name')
+        ),
+    ]
+
+
+class IssueSearchResults(List):
+    result_key = 'issues'
+    of = IssueDetails
+
+
 class JiraUser(Item):
     fields = [
         Field('account_id'),
@@ -190,6 +389,8 @@ class AccessibleResources(List):
 
 
 class WorkAttributeValues(Item):
+    __slots__ = ('values', )
+
     def populate(self, data: dict):
         self.values = data['values']
 
@@ -206,10 +407,7 @@ class Worklog(Item):
         DateTimeField('created_at'),
         DateTimeField('updated_at'),
         TimeDeltaField('time_spent', 'timeSpentSeconds'),
-        DateTimeField(
-            'started',
-            lambda data: f'{data["startDate"]}T{data["startTime"]}Z'
-        ),
+        CombinedDateTimeField('started', 'startDate', 'startTime'),
     ]
 
 
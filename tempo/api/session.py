@@ -0,0 +1,52 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RetryPolicy(Retry):
+    '''
+        urllib3 only retries idempotent methods. A 429 means the server
+        did not process the request, so it is safe to retry any method.
+    '''
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if status_code == 429 and self.total:
+            return True
+        return super().is_retry(
+            method, status_code, has_retry_after=has_retry_after
+        )
+
+
+def create_session(
+    pool_size: int = 10,
+    max_retries: int = 3,
+    backoff_factor: float = 0.5,
+    keep_alive: bool = True,
+) -> requests.Session:
+    '''
+        Create a session with a connection pool per host and a retry
+        policy for 429/5xx responses that honours Retry-After.
+        Pass the same session to several clients to share the pool.
+    '''
+    session = requests.Session()
+    retry = RetryPolicy(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        status_forcelist=RETRY_STATUSES,
+        backoff_factor=backoff_factor,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retry,
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    return session
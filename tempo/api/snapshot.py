@@ -0,0 +1,212 @@
+'''
+    Compact snapshots of model collections such as Worklogs.
+
+    A snapshot is a fixed binary header with the format version followed
+    by a zlib compressed JSON body that also records the schema of the
+    item model, so a snapshot written by an incompatible version is
+    rejected instead of producing half broken models. Records are stored
+    column by column and grouped by their key layout, which compresses
+    well and lets loading rebuild each record with one compiled dict
+    display instead of parsing keys.
+'''
+import gc
+import itertools
+import json
+import os
+import struct
+import tempfile
+import zlib
+
+from tempo.api import models
+
+MAGIC = b'TEMPOSNP'
+VERSION = 1
+HEADER = struct.Struct('>8sHI')
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def shape_of(value):
+    '''
+        The nested key layout of a record, None for a leaf value.
+    '''
+    if isinstance(value, dict):
+        return tuple((key, shape_of(item)) for key, item in value.items())
+    return None
+
+
+def flatten(value, shape, out: list):
+    if shape is None:
+        out.append(value)
+        return
+    for key, sub_shape in shape:
+        flatten(value[key], sub_shape, out)
+
+
+def compile_builder(shape):
+    '''
+        Build a function turning the columns of one shape back into
+        records, with the dict layout written out as a single display.
+    '''
+    counter = itertools.count()
+
+    def display(shape):
+        if shape is None:
+            return f'c{next(counter)}'
+        return '{%s}' % ', '.join(
+            f'{key!r}: {display(sub_shape)}' for key, sub_shape in shape
+        )
+
+    body = display(shape)
+    names = [f'c{i}' for i in range(next(counter))]
+    if names:
+        source = (
+            'def build(columns):\n'
+            f'    return [{body} for {", ".join(names)}, in zip(*columns)]'
+        )
+    else:
+        source = (
+            'def build(columns):\n'
+            f'    return [{body} for _ in range(columns)]'
+        )
+    namespace = {}
+    exec(source, namespace)
+    return namespace['build']
+
+
+def thaw_shape(shape):
+    if shape is None:
+        return None
+    thawed = []
+    for key, sub_shape in shape:
+        if not isinstance(key, str):
+            raise SnapshotError(f'Invalid key {key!r} in snapshot')
+        thawed.append((key, thaw_shape(sub_shape)))
+    return tuple(thawed)
+
+
+def schema(item_type) -> list:
+    return [
+        [
+            field.name,
+            field.data_key if isinstance(field.data_key, str) else None,
+            type(field).__name__,
+        ]
+        for field in item_type.fields
+    ]
+
+
+def model_types(name: str):
+    collection_type = getattr(models, name, None)
+    if not (
+        isinstance(collection_type, type)
+        and issubclass(collection_type, models.List)
+        and hasattr(collection_type, 'of')
+    ):
+        raise SnapshotError(f'Unknown snapshot model {name}')
+    return collection_type, collection_type.of
+
+
+def dumps(collection: models.List, level: int = 6) -> bytes:
+    collection_type = type(collection)
+    model_types(collection_type.__name__)
+    raw = collection.raw_data
+    records = raw[collection_type.result_key]
+    shapes = {}
+    order = []
+    for record in records:
+        shape = shape_of(record)
+        if shape not in shapes:
+            shapes[shape] = (len(shapes), [])
+        index, rows = shapes[shape]
+        order.append(index)
+        row = []
+        flatten(record, shape, row)
+        rows.append(row)
+    groups = [
+        {
+            'shape': shape,
+            'columns': [list(column) for column in zip(*rows)] or len(rows),
+        }
+        for shape, (index, rows) in shapes.items()
+    ]
+    body = {
+        'model': collection_type.__name__,
+        'schema': schema(collection_type.of),
+        'members': {
+            key: value for key, value in raw.items()
+            if key != collection_type.result_key
+        },
+        'groups': groups,
+        'order': order if len(groups) > 1 else None,
+    }
+    payload = zlib.compress(
+        json.dumps(body, separators=(',', ':')).encode(), level
+    )
+    return HEADER.pack(MAGIC, VERSION, len(payload)) + payload
+
+
+def loads(data: bytes) -> models.List:
+    if len(data) < HEADER.size:
+        raise SnapshotError('Truncated snapshot')
+    magic, version, length = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError('Not a snapshot')
+    if version != VERSION:
+        raise SnapshotError(f'Unsupported snapshot version {version}')
+    payload = data[HEADER.size:HEADER.size + length]
+    if len(payload) != length:
+        raise SnapshotError('Truncated snapshot')
+    # Rebuilding many small dicts triggers the cyclic garbage collector
+    # over and over although none of them can form cycles.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        try:
+            body = json.loads(zlib.decompress(payload))
+        except (zlib.error, ValueError) as e:
+            raise SnapshotError(f'Corrupt snapshot: {e}')
+        collection_type, item_type = model_types(body['model'])
+        if body['schema'] != schema(item_type):
+            raise SnapshotError(
+                f'Snapshot of {body["model"]} was written for another schema'
+            )
+        try:
+            built = [
+                compile_builder(thaw_shape(group['shape']))(group['columns'])
+                for group in body['groups']
+            ]
+            if body['order'] is None:
+                records = built[0] if built else []
+            else:
+                groups = [iter(records) for records in built]
+                records = [next(groups[index]) for index in body['order']]
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            raise SnapshotError(f'Corrupt snapshot: {e!r}')
+        raw = dict(body['members'])
+        raw[collection_type.result_key] = records
+        return collection_type(raw)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def save(collection: models.List, path: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(dumps(collection))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def load(path: str) -> models.List:
+    with open(path, 'rb') as f:
+        return loads(f.read())
@@ -0,0 +1,131 @@
+import codecs
+import json
+from typing import Iterable, Union
+
+WHITESPACE = ' \t\n\r'
+NUMBER_CHARS = '0123456789.eE+-'
+
+
+class JSONStream:
+    '''
+        Incremental reader for a JSON object with one large array member.
+        Iterating yields the elements of that array as they are decoded
+        from the chunks, the other members are collected in members.
+        Only the current chunk and the element being decoded are kept
+        in memory.
+    '''
+    def __init__(
+        self,
+        chunks: Iterable[Union[bytes, str]],
+        array_key: str = 'results',
+    ):
+        self.chunks = iter(chunks)
+        self.array_key = array_key
+        self.text = codecs.getincrementaldecoder('utf-8')()
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.members = {}
+        self.state = 'start'
+        self.bare_array = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self.text.decode(b'', final=True)
+        elif isinstance(chunk, bytes):
+            text = self.text.decode(chunk)
+        else:
+            text = chunk
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while (
+                self.pos < len(self.buffer)
+                and self.buffer[self.pos] in WHITESPACE
+            ):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise ValueError('Unexpected end of JSON stream')
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f'Expected one of {chars!r}, got {char!r}')
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the
+            # next chunk.
+            rest = self.buffer[end:]
+            if not rest.lstrip(NUMBER_CHARS) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def next_member(self):
+        if self.expect(',}') == '}':
+            self.state = 'done'
+        else:
+            self.state = 'members'
+
+    def end_array(self):
+        if self.bare_array:
+            self.state = 'done'
+        else:
+            self.next_member()
+
+    def read_members(self):
+        '''
+            Read members until the start of the array or the end of the
+            object.
+        '''
+        if self.state == 'start':
+            if self.expect('{[') == '[':
+                self.bare_array = True
+                self.state = 'array'
+                return
+            if self.peek() == '}':
+                self.pos += 1
+                self.state = 'done'
+                return
+            self.state = 'members'
+        while self.state == 'members':
+            key = self.value()
+            self.expect(':')
+            if key == self.array_key:
+                self.expect('[')
+                self.state = 'array'
+                return
+            self.members[key] = self.value()
+            self.next_member()
+
+    def __iter__(self):
+        self.read_members()
+        while self.state == 'array':
+            if self.peek() == ']':
+                self.pos += 1
+                self.end_array()
+                break
+            yield self.value()
+            if self.expect(',]') == ']':
+                self.end_array()
+        self.read_members()
@@ -0,0 +1,69 @@
+'''
+    Parsing for the fixed timestamp formats used by Tempo and Jira.
+    Well formed values are sliced instead of going through strptime,
+    and dates and times are cached since a batch of worklogs repeats
+    the same few days. Anything else falls back to strptime so the
+    results and errors stay the same.
+'''
+import datetime
+import functools
+import re
+
+DATE_FORMAT = '%Y-%m-%d'
+TIME_FORMAT = '%H:%M:%S'
+DATETIME_FORMAT = f'{DATE_FORMAT}T{TIME_FORMAT}Z'
+
+DATE_PATTERN = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+TIME_PATTERN = re.compile(r'[0-9]{2}:[0-9]{2}:[0-9]{2}')
+DATETIME_PATTERN = re.compile(
+    r'[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}Z'
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_date(value: str) -> datetime.date:
+    if DATE_PATTERN.fullmatch(value):
+        try:
+            return datetime.date(
+                int(value[0:4]), int(value[5:7]), int(value[8:10])
+            )
+        except ValueError:
+            pass
+    return datetime.datetime.strptime(value, DATE_FORMAT).date()
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_time(value: str) -> datetime.time:
+    if TIME_PATTERN.fullmatch(value):
+        try:
+            return datetime.time(
+                int(value[0:2]), int(value[3:5]), int(value[6:8])
+            )
+        except ValueError:
+            pass
+    return datetime.datetime.strptime(value, TIME_FORMAT).time()
+
+
+def parse_datetime(value: str) -> datetime.datetime:
+    '''
+        Parse DATETIME_FORMAT into a naive datetime, like strptime does.
+    '''
+    if DATETIME_PATTERN.fullmatch(value):
+        try:
+            return datetime.datetime.combine(
+                parse_date(value[0:10]), parse_time(value[11:19])
+            )
+        except ValueError:
+            pass
+    return datetime.datetime.strptime(value, DATETIME_FORMAT)
+
+
+def combine(date: str, time: str) -> datetime.datetime:
+    '''
+        Build a datetime from separate date and time strings without
+        formatting them into one string first.
+    '''
+    try:
+        return datetime.datetime.combine(parse_date(date), parse_time(time))
+    except (TypeError, ValueError):
+        return datetime.datetime.strptime(f'{date}T{time}Z', DATETIME_FORMAT)
@@ -0,0 +1,137 @@
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+
+from appdirs import user_cache_dir
+
+from tempo.config import config, as_bool
+
+logger = logging.getLogger(__name__)
+
+TOKEN_DIR = user_cache_dir(appname='tempo')
+
+
+def parse_expires(value) -> float:
+    '''
+        Tempo reports expiresAt either as an epoch timestamp in seconds or
+        milliseconds, or as an ISO 8601 string. Returns epoch seconds.
+    '''
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            try:
+                parsed = datetime.datetime.fromisoformat(
+                    value.replace('Z', '+00:00')
+                )
+            except ValueError:
+                logger.warning('Could not parse expiresAt %s', value)
+                return None
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+            return parsed.timestamp()
+    if value > 1e11:
+        return value / 1000
+    return float(value)
+
+
+class JiraTokenManager:
+    '''
+        Caches the Jira token handed out by Tempo, in memory and
+        optionally on disk, and refreshes it in the background shortly
+        before it expires.
+    '''
+    def __init__(self, tempo, refresh_margin: float = 300, path: str = None):
+        self.tempo = tempo
+        self.refresh_margin = refresh_margin
+        if path is None and as_bool(config.jira.cache_token):
+            # Clients made without a token have no identity.
+            identity = (tempo.identity or 'anonymous')[:16]
+            path = os.path.join(TOKEN_DIR, f'jira-token-{identity}.json')
+        self.path = path
+        self.lock = threading.Lock()
+        self.token = None
+        self.expires_at = None
+        self.timer = None
+        self.loaded = False
+
+    def is_valid(self) -> bool:
+        if self.token is None:
+            return False
+        if self.expires_at is None:
+            return True
+        return self.expires_at - time.time() > 30
+
+    def get(self) -> str:
+        with self.lock:
+            if not self.loaded:
+                self.loaded = True
+                self.load()
+            if not self.is_valid():
+                self.fetch()
+            return self.token
+
+    def refresh(self) -> str:
+        with self.lock:
+            self.fetch()
+            return self.token
+
+    def fetch(self):
+        token_request = self.tempo.get(
+            '/jira/v1/get-jira-oauth-token/',
+            prefix=None
+        )
+        self.token = token_request['token']
+        self.expires_at = parse_expires(token_request.get('expiresAt'))
+        self.save()
+        self.schedule_refresh()
+
+    def schedule_refresh(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.expires_at is None:
+            return
+        delay = self.expires_at - self.refresh_margin - time.time()
+        if delay <= 0:
+            return
+        self.timer = threading.Timer(delay, self.refresh_in_background)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception('Could not refresh the Jira token')
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            logger.warning('Ignoring unreadable Jira token cache')
+            return
+        self.token = data.get('token')
+        self.expires_at = data.get('expires_at')
+        if self.is_valid():
+            self.schedule_refresh()
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'token': self.token, 'expires_at': self.expires_at}, f)
+
+    def close(self):
+        if self.timer is not None:
+            self.timer.cancel()
@@ -1,6 +1,15 @@
 import os
 import logging
 import configparser
+import contextlib
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 from appdirs import user_config_dir
 
@@ -21,13 +30,33 @@ def get_defaults():
             'client_id': None,
             'client_secret': None,
             'first_day_of_week': 0,
+            'token_validation_ttl': 24 * 60 * 60,
         },
         'jira': {
-            'url': None
-        }
+            'url': None,
+            'account_id': None,
+            'cache_token': True,
+        },
+        'http': {
+            'timeout': 30,
+            'pool_size': 10,
+            'max_retries': 3,
+            'backoff_factor': 0.5,
+            'keep_alive': True,
+            'background_workers': 8,
+            'disk_cache': True,
+            'disk_cache_max_bytes': 50 * 1024 * 1024,
+            'metrics_file': None,
+        },
     }
 
 
+def as_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.lower() in ('1', 'yes', 'true', 'on')
+    return bool(value)
+
+
 class Section:
     def __init__(self, name, update):
         super().__setattr__('name', name)
@@ -41,47 +70,215 @@ class Section:
             raise ValueError(msg)
         super().__setattr__(name, value)
         if self._ready:
-            self.update()
+            self.update(self.name, name)
+
+    def load(self, name, value):
+        '''
+            Set a value read from disk without marking it as changed.
+        '''
+        super().__setattr__(name, value)
 
     def ready(self):
         super().__setattr__('_ready', True)
 
 
+@contextlib.contextmanager
+def file_lock(path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def get_mtime(path: str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def serialize(value):
+    return None if value is None else str(value)
+
+
 class Config:
-    def __init__(self, disk_cfg):
-        defaults = get_defaults()
-        sections = disk_cfg.sections()
+    '''
+        Configuration values backed by config.ini.
+        Changes are saved right away, or once at the end of a
+        transaction(). Saving merges the changed keys into the current
+        file under a lock and replaces it atomically, so concurrent
+        processes do not lose each other's changes. Changes made by
+        other processes are picked up when the file's mtime changes.
+    '''
+    reload_interval = 1
+
+    def __init__(self, disk_cfg, path: str = None):
+        self.path = path or CONFIG_FILE_NAME
+        self.lock = threading.RLock()
+        self.dirty = set()
+        self.depth = 0
         self.sections = {}
-        for section_name, default_values in defaults.items():
+        for section_name in get_defaults():
             section = Section(name=section_name, update=self.update)
             setattr(self, section_name, section)
-            for key, value in default_values.items():
-                if section_name in sections and key in disk_cfg[section_name]:
-                    setattr(section, key, disk_cfg[section_name][key])
-                else:
-                    setattr(section, key, value)
-            section.ready()
             self.sections[section_name] = section
+        self.apply(disk_cfg)
+        for section in self.sections.values():
+            section.ready()
+        self.mtime = get_mtime(self.path)
+        self.checked_at = time.monotonic()
+
+    def apply(self, disk_cfg):
+        '''
+            Take the values from disk_cfg, keeping unsaved changes.
+        '''
+        for section_name, default_values in get_defaults().items():
+            section = self.sections[section_name]
+            for key, value in default_values.items():
+                if (section_name, key) in self.dirty:
+                    continue
+                if disk_cfg.has_option(section_name, key):
+                    value = disk_cfg.get(section_name, key)
+                section.load(key, value)
         self.disk_config = disk_cfg
 
-    def update(self):
-        os.makedirs(os.path.dirname(CONFIG_FILE_NAME), exist_ok=True)
-        for section, values in get_defaults().items():
-            if section not in self.disk_config.sections():
-                self.disk_config.add_section(section)
-            for key, value in values.items():
-                self.disk_config.set(
-                    section, key, getattr(self.sections[section], key)
-                )
-        with open(CONFIG_FILE_NAME, 'w') as f:
-            self.disk_config.write(f)
+    def update(self, section: str, key: str):
+        with self.lock:
+            self.dirty.add((section, key))
+            if self.depth == 0:
+                self.save()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        '''
+            Save all changes made inside the block at once when it ends,
+            or drop them if it raises.
+        '''
+        with self.lock:
+            self.depth += 1
+            try:
+                yield self
+            except BaseException:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.rollback()
+                raise
+            self.depth -= 1
+            if self.depth == 0:
+                self.save()
+
+    def rollback(self):
+        with self.lock:
+            self.dirty.clear()
+            self.apply(self.disk_config)
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            with file_lock(f'{self.path}.lock'):
+                disk_cfg = get_disk_config(self.path)
+                for section_name, values in get_defaults().items():
+                    if not disk_cfg.has_section(section_name):
+                        disk_cfg.add_section(section_name)
+                    section = self.sections[section_name]
+                    for key in values:
+                        if (
+                            (section_name, key) in self.dirty
+                            or not disk_cfg.has_option(section_name, key)
+                        ):
+                            disk_cfg.set(
+                                section_name,
+                                key,
+                                serialize(getattr(section, key)),
+                            )
+                self.write(disk_cfg)
+                self.dirty.clear()
+                self.mtime = get_mtime(self.path)
+            self.apply(disk_cfg)
 
+    def write(self, disk_cfg):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                disk_cfg.write(f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
 
-def get_disk_config():
+    def reload_if_changed(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self.checked_at < self.reload_interval:
+            return
+        self.checked_at = now
+        mtime = get_mtime(self.path)
+        if mtime == self.mtime:
+            return
+        with self.lock:
+            logger.info('Reloading changed %s', self.path)
+            self.apply(get_disk_config(self.path))
+            self.mtime = mtime
+
+
+def get_disk_config(path: str = None):
+    path = path or CONFIG_FILE_NAME
     parser = configparser.ConfigParser(allow_no_value=True)
-    if os.path.exists(CONFIG_FILE_NAME):
-        parser.read(CONFIG_FILE_NAME)
+    if os.path.exists(path):
+        parser.read(path)
     return parser
 
 
-config = Config(get_disk_config())
+class LazyConfig:
+    '''
+        Stands in for the Config instance and reads the configuration
+        file the first time a value is needed instead of at import.
+    '''
+    def __init__(self):
+        super().__setattr__('instance', None)
+        super().__setattr__('lock', threading.Lock())
+
+    @property
+    def loaded(self) -> bool:
+        return self.instance is not None
+
+    def load(self) -> Config:
+        if self.instance is None:
+            with self.lock:
+                if self.instance is None:
+                    super().__setattr__(
+                        'instance', Config(get_disk_config())
+                    )
+        return self.instance
+
+    def __getattr__(self, name):
+        instance = self.load()
+        instance.reload_if_changed()
+        return getattr(instance, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.load(), name, value)
+
+
+class ConfigValue:
+    '''
+        Class attribute that reads a configuration value when accessed.
+        Instances and tests can still override it.
+    '''
+    def __init__(self, section: str, key: str):
+        self.section = section
+        self.key = key
+
+    def __get__(self, instance, owner):
+        return getattr(getattr(config, self.section), self.key)
+
+
+config = LazyConfig()
@@ -0,0 +1,201 @@
+import datetime
+import functools
+from collections import defaultdict
+from typing import Iterable, Union
+
+from tempo.api import models
+from tempo.api.timestamps import parse_date, parse_time
+
+EPOCH = datetime.date(1970, 1, 1).toordinal()
+DAY = 86400
+
+GROUPINGS = ('day', 'issue', 'project', 'author')
+
+
+@functools.lru_cache(maxsize=None)
+def get_numpy():
+    # Imported on first use, numpy alone takes longer to import than
+    # the rest of the CLI.
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def default_backend() -> str:
+    return 'python' if get_numpy() is None else 'numpy'
+
+
+class WorklogFrame:
+    '''
+        Worklogs stored column by column for aggregation over long
+        histories. Start times are the worklog's wall clock time as epoch
+        seconds, durations are seconds. Columns are NumPy arrays when
+        NumPy is installed and plain lists otherwise.
+    '''
+    columns = (
+        'id', 'started', 'time_spent', 'billable',
+        'issue', 'project', 'author',
+    )
+    numeric = ('id', 'started', 'time_spent', 'billable')
+
+    def __init__(self, data: dict, backend: str = None):
+        self.backend = backend or default_backend()
+        if self.backend == 'numpy':
+            numpy = get_numpy()
+            if numpy is None:
+                raise ImportError('The numpy backend needs numpy installed')
+            data = {
+                name: numpy.asarray(
+                    data[name],
+                    dtype=numpy.int64 if name in self.numeric else str,
+                )
+                for name in self.columns
+            }
+        elif self.backend == 'python':
+            data = {name: list(data[name]) for name in self.columns}
+        else:
+            raise ValueError(f'Unknown backend {self.backend}')
+        self.data = data
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[dict],
+        backend: str = None,
+    ) -> 'WorklogFrame':
+        '''
+            Build a frame straight from Tempo worklog JSON without
+            converting any fields to Python objects.
+        '''
+        data = {name: [] for name in cls.columns}
+        for record in records:
+            time = parse_time(record['startTime'])
+            issue = record['issue']['key']
+            data['id'].append(record['tempoWorklogId'])
+            data['started'].append(
+                (parse_date(record['startDate']).toordinal() - EPOCH) * DAY
+                + time.hour * 3600 + time.minute * 60 + time.second
+            )
+            data['time_spent'].append(record['timeSpentSeconds'])
+            data['billable'].append(record.get('billableSeconds') or 0)
+            data['issue'].append(issue)
+            data['project'].append(issue.rpartition('-')[0])
+            data['author'].append(record['author']['accountId'])
+        return cls(data, backend=backend)
+
+    @classmethod
+    def from_worklogs(
+        cls,
+        worklogs: Union[models.Worklogs, Iterable[models.Worklog]],
+        backend: str = None,
+    ) -> 'WorklogFrame':
+        return cls.from_records(
+            (worklog.raw_data for worklog in worklogs), backend=backend
+        )
+
+    def __len__(self):
+        return len(self.data['id'])
+
+    def __getitem__(self, name: str):
+        return self.data[name]
+
+    def days(self):
+        started = self.data['started']
+        if self.backend == 'numpy':
+            return started // DAY
+        return [value // DAY for value in started]
+
+    def keys(self, grouping: str):
+        if grouping == 'day':
+            return self.days()
+        if grouping not in GROUPINGS:
+            raise ValueError(f'Cannot group by {grouping}')
+        return self.data[grouping]
+
+    @staticmethod
+    def key_value(grouping: str, value):
+        if grouping == 'day':
+            return datetime.date.fromordinal(EPOCH + int(value))
+        return str(value)
+
+    def between(
+        self,
+        from_date: datetime.date,
+        to_date: datetime.date,
+    ) -> 'WorklogFrame':
+        '''
+            Worklogs started between from_date and to_date, inclusive.
+        '''
+        low = (from_date.toordinal() - EPOCH) * DAY
+        high = (to_date.toordinal() - EPOCH + 1) * DAY
+        started = self.data['started']
+        if self.backend == 'numpy':
+            mask = (started >= low) & (started < high)
+            data = {name: self.data[name][mask] for name in self.columns}
+        else:
+            rows = [
+                i for i, value in enumerate(started) if low <= value < high
+            ]
+            data = {
+                name: [self.data[name][i] for i in rows]
+                for name in self.columns
+            }
+        return type(self)(data, backend=self.backend)
+
+    def total(self, column: str = 'time_spent') -> int:
+        return int(sum(self.data[column]))
+
+    def group_by(self, by, column: str = 'time_spent') -> dict:
+        '''
+            Sum a column per day, issue, project or author. Pass a tuple
+            of groupings to get totals keyed by tuples, e.g.
+            group_by(('author', 'day')).
+        '''
+        groupings = (by, ) if isinstance(by, str) else tuple(by)
+        if self.backend == 'numpy':
+            totals = self.numpy_group_by(groupings, column)
+        else:
+            totals = defaultdict(int)
+            keys = zip(*(self.keys(grouping) for grouping in groupings))
+            for key, value in zip(keys, self.data[column]):
+                totals[key] += value
+            totals = {
+                tuple(
+                    self.key_value(grouping, value)
+                    for grouping, value in zip(groupings, key)
+                ): total
+                for key, total in totals.items()
+            }
+        if isinstance(by, str):
+            return {key[0]: total for key, total in totals.items()}
+        return totals
+
+    def numpy_group_by(self, groupings: tuple, column: str) -> dict:
+        if not len(self):
+            return {}
+        numpy = get_numpy()
+        codes = None
+        uniques = []
+        for grouping in groupings:
+            values, inverse = numpy.unique(
+                self.keys(grouping), return_inverse=True
+            )
+            uniques.append(values)
+            inverse = inverse.reshape(-1)
+            codes = inverse if codes is None else codes * len(values) + inverse
+        groups, inverse = numpy.unique(codes, return_inverse=True)
+        sums = numpy.bincount(
+            inverse.reshape(-1),
+            weights=self.data[column],
+            minlength=len(groups),
+        )
+        totals = {}
+        for code, total in zip(groups.tolist(), sums.tolist()):
+            key = []
+            for grouping, values in zip(groupings[::-1], uniques[::-1]):
+                code, index = divmod(code, len(values))
+                key.append(self.key_value(grouping, values[index]))
+            totals[tuple(key[::-1])] = int(total)
+        return totals
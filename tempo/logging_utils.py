@@ -1,38 +1,98 @@
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 from appdirs import user_cache_dir
 
+from tempo.config import file_lock
 
-def configure_logging():
-    cache_dir = user_cache_dir(appname='tempo')
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+ROOT_LOGGERS = ('tempo', 'tempo_cli')
 
-    LOG_FILE_NAME = os.path.join(
-        cache_dir, 'tempo.log'
-    )
+listener = None
+queue_handler = None
+
+
+class SharedRotatingFileHandler(RotatingFileHandler):
+    '''
+        RotatingFileHandler that several processes can write to.
+        Each record is written, and the file rotated, while holding a
+        lock file, and a file that another process rotated is reopened
+        instead of being written to after it was renamed.
+    '''
+    def __init__(self, filename, **kwargs):
+        super().__init__(filename, delay=True, **kwargs)
+        self.lock_path = f'{self.baseFilename}.lock'
+
+    def emit(self, record):
+        try:
+            with file_lock(self.lock_path):
+                self.reopen_if_rotated()
+                super().emit(record)
+        except OSError:
+            self.handleError(record)
+
+    def reopen_if_rotated(self):
+        if self.stream is None:
+            return
+        try:
+            current = os.stat(self.baseFilename).st_ino
+        except FileNotFoundError:
+            current = None
+        if current != os.fstat(self.stream.fileno()).st_ino:
+            self.stream.close()
+            self.stream = None
 
-    LOG_LEVEL = getattr(
-        logging,
-        os.getenv('LOG_LEVEL', '').upper(),
-        logging.INFO
+
+def configure_logging(filename: str = None) -> QueueListener:
+    '''
+        Send records of the tempo and tempo_cli loggers through a queue
+        to a single file handler running on a background thread, so
+        logging never blocks the UI on disk I/O. Messages are
+        formatted when they are queued, while their arguments still
+        hold the logged values.
+    '''
+    global listener, queue_handler
+    if listener is not None:
+        return listener
+    if filename is None:
+        filename = os.path.join(user_cache_dir(appname='tempo'), 'tempo.log')
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+    level = getattr(logging, os.getenv('LOG_LEVEL', '').upper(), logging.INFO)
+
+    handler = SharedRotatingFileHandler(
+        filename,
+        maxBytes=1024 * 1024 * 10,
+        backupCount=10,
     )
+    handler.setLevel(level)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
 
-    if not os.path.isdir(cache_dir):
-        os.makedirs(cache_dir)
+    records = queue.SimpleQueue()
+    listener = QueueListener(records, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_logging)
 
-    for root_logger in ('tempo', 'tempo_cli'):
+    queue_handler = QueueHandler(records)
+    for root_logger in ROOT_LOGGERS:
         logger = logging.getLogger(root_logger)
-        logger.setLevel(LOG_LEVEL)
-        handler = RotatingFileHandler(
-            LOG_FILE_NAME,
-            maxBytes=1024 * 1024 * 10,
-            backupCount=10,
-        )
-        handler.setLevel(LOG_LEVEL)
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        logger.debug(f'{root_logger} logger set up')
+        logger.setLevel(level)
+        logger.addHandler(queue_handler)
+        logger.debug('%s logger set up', root_logger)
+    return listener
+
+
+def stop_logging():
+    '''
+        Write out queued records and detach the queue handler.
+    '''
+    global listener, queue_handler
+    if listener is None:
+        return
+    for root_logger in ROOT_LOGGERS:
+        logging.getLogger(root_logger).removeHandler(queue_handler)
+    listener.stop()
+    listener = queue_handler = None
@@ -0,0 +1,302 @@
+import datetime
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import List
+
+from appdirs import user_cache_dir
+
+from tempo.api import models
+from tempo.api.models import DATE_FORMAT
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = user_cache_dir(appname='tempo')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS worklogs (
+    id INTEGER PRIMARY KEY,
+    account_id TEXT,
+    issue_key TEXT,
+    start_date TEXT NOT NULL,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS worklogs_start_date ON worklogs (start_date);
+CREATE INDEX IF NOT EXISTS worklogs_account_id
+    ON worklogs (account_id, start_date);
+CREATE TABLE IF NOT EXISTS schedules (
+    account_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (account_id, date)
+);
+CREATE TABLE IF NOT EXISTS synced_ranges (
+    scope TEXT NOT NULL,
+    from_date TEXT NOT NULL,
+    to_date TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS watermarks (
+    scope TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+'''
+
+
+def format_date(date: datetime.date) -> str:
+    return date.strftime(DATE_FORMAT)
+
+
+class WorklogStore:
+    '''
+        Local SQLite copy of worklogs and user schedules.
+        The first sync of a date range downloads it fully, later syncs
+        only ask Tempo for worklogs updated since the last watermark.
+        Updates do not report deletions, so a range is also reconciled
+        when it is synced again after reconcile_ttl seconds.
+    '''
+    reconcile_ttl = 5 * 60
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.reconciled = {}
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+
+    @classmethod
+    def for_account(
+        cls, jira_url: str, account_id: str, directory: str = STORE_DIR
+    ):
+        '''
+            Open the store of one user. Access tokens are rotated when
+            they are refreshed, so the file is named after the Jira site
+            and account instead.
+        '''
+        key = hashlib.sha256(f'{jira_url}|{account_id}'.encode()).hexdigest()
+        return cls(os.path.join(directory, f'worklogs-{key[:16]}.sqlite'))
+
+    def close(self):
+        self.connection.close()
+
+    def execute(self, sql: str, params=()) -> list:
+        with self.lock, self.connection:
+            return self.connection.execute(sql, params).fetchall()
+
+    def upsert_worklogs(self, worklogs: List[models.Worklog]) -> int:
+        rows = [
+            (
+                worklog.id,
+                worklog.author.account_id,
+                worklog.issue.key,
+                worklog.raw_data['startDate'],
+                worklog.raw_data.get('updatedAt'),
+                json.dumps(worklog.raw_data),
+            )
+            for worklog in worklogs
+        ]
+        with self.lock, self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO worklogs '
+                '(id, account_id, issue_key, start_date, updated_at, data) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                rows,
+            )
+        return len(rows)
+
+    def delete_worklog(self, worklog_id: int):
+        self.execute('DELETE FROM worklogs WHERE id = ?', (worklog_id, ))
+
+    def worklogs(
+        self,
+        from_date: datetime.date,
+        to_date: datetime.date,
+        account_id: str = None,
+    ) -> List[models.Worklog]:
+        sql = (
+            'SELECT data FROM worklogs '
+            'WHERE start_date BETWEEN ? AND ?'
+        )
+        params = [format_date(from_date), format_date(to_date)]
+        if account_id:
+            sql += ' AND account_id = ?'
+            params.append(account_id)
+        sql += ' ORDER BY start_date, id'
+        return [
+            models.Worklog(json.loads(data))
+            for data, in self.execute(sql, params)
+        ]
+
+    def recent_issue_keys(self, limit: int = 500) -> list:
+        '''
+            Issue keys with worklogs, most recently worked on first,
+            with the start of the latest worklog as epoch seconds.
+        '''
+        return [
+            (
+                issue_key,
+                datetime.datetime.strptime(
+                    start_date, DATE_FORMAT
+                ).timestamp(),
+            )
+            for issue_key, start_date in self.execute(
+                'SELECT issue_key, MAX(start_date) AS latest FROM worklogs '
+                'GROUP BY issue_key ORDER BY latest DESC LIMIT ?',
+                (limit, ),
+            )
+        ]
+
+    def schedules(
+        self,
+        from_date: datetime.date,
+        to_date: datetime.date,
+        account_id: str = '',
+    ) -> List[models.UserSchedule]:
+        return [
+            models.UserSchedule(json.loads(data))
+            for data, in self.execute(
+                'SELECT data FROM schedules '
+                'WHERE account_id = ? AND date BETWEEN ? AND ? '
+                'ORDER BY date',
+                (account_id, format_date(from_date), format_date(to_date)),
+            )
+        ]
+
+    def watermark(self, scope: str):
+        rows = self.execute(
+            'SELECT value FROM watermarks WHERE scope = ?', (scope, )
+        )
+        if rows:
+            return datetime.datetime.strptime(rows[0][0], DATE_FORMAT).date()
+        return None
+
+    def set_watermark(self, scope: str, value: datetime.date):
+        self.execute(
+            'INSERT OR REPLACE INTO watermarks (scope, value) VALUES (?, ?)',
+            (scope, format_date(value)),
+        )
+
+    def is_synced(self, scope: str, from_date, to_date) -> bool:
+        return bool(self.execute(
+            'SELECT 1 FROM synced_ranges '
+            'WHERE scope = ? AND from_date <= ? AND to_date >= ?',
+            (scope, format_date(from_date), format_date(to_date)),
+        ))
+
+    def mark_synced(self, scope: str, from_date, to_date):
+        self.execute(
+            'INSERT INTO synced_ranges (scope, from_date, to_date) '
+            'VALUES (?, ?, ?)',
+            (scope, format_date(from_date), format_date(to_date)),
+        )
+
+    def reconcile(
+        self,
+        tempo,
+        from_date: datetime.date,
+        to_date: datetime.date,
+        account_id: str = None,
+    ) -> int:
+        '''
+            Download the full range and drop local worklogs in it that no
+            longer exist remotely. Returns the number of changed rows.
+        '''
+        scope = f'worklogs:{account_id or ""}'
+        local_ids = {
+            worklog_id for worklog_id, in self.execute(
+                'SELECT id FROM worklogs WHERE start_date BETWEEN ? AND ?'
+                + (' AND account_id = ?' if account_id else ''),
+                [format_date(from_date), format_date(to_date)]
+                + ([account_id] if account_id else []),
+            )
+        }
+        remote = list(tempo.iter_worklogs(
+            account_id=account_id,
+            from_date=from_date,
+            to_date=to_date,
+        ))
+        deleted = local_ids - {worklog.id for worklog in remote}
+        for worklog_id in deleted:
+            self.delete_worklog(worklog_id)
+        self.upsert_worklogs(remote)
+        if not self.is_synced(scope, from_date, to_date):
+            self.mark_synced(scope, from_date, to_date)
+        with self.lock:
+            self.reconciled[(scope, from_date, to_date)] = time.monotonic()
+        return len(remote) + len(deleted)
+
+    def needs_reconcile(self, scope: str, from_date, to_date) -> bool:
+        if not self.is_synced(scope, from_date, to_date):
+            return True
+        with self.lock:
+            reconciled_at = self.reconciled.get((scope, from_date, to_date))
+        return (
+            reconciled_at is None
+            or time.monotonic() - reconciled_at > self.reconcile_ttl
+        )
+
+    def sync(
+        self,
+        tempo,
+        from_date: datetime.date,
+        to_date: datetime.date,
+        account_id: str = None,
+    ) -> int:
+        '''
+            Make sure the range is available locally and pull worklogs
+            changed since the last sync. The range is reconciled the first
+            time it is synced by this store, and again once reconcile_ttl
+            has passed. Returns the number of changed rows.
+        '''
+        scope = f'worklogs:{account_id or ""}'
+        started = datetime.date.today()
+        watermark = self.watermark(scope)
+        changed = 0
+        if self.needs_reconcile(scope, from_date, to_date):
+            changed += self.reconcile(tempo, from_date, to_date, account_id)
+        if watermark is not None:
+            changed += self.upsert_worklogs(tempo.iter_worklogs(
+                account_id=account_id,
+                updated_from=watermark,
+            ))
+        self.set_watermark(scope, started)
+        logger.info('Synced %s changed worklogs for %s', changed, scope)
+        return changed
+
+    def sync_schedules(
+        self,
+        tempo,
+        from_date: datetime.date,
+        to_date: datetime.date,
+        account_id: str = None,
+    ) -> bool:
+        scope = f'schedules:{account_id or ""}'
+        if self.is_synced(scope, from_date, to_date):
+            return False
+        schedules = tempo.user_schedules(
+            account_id=account_id,
+            from_date=from_date,
+            to_date=to_date,
+        )
+        with self.lock, self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO schedules (account_id, date, data) '
+                'VALUES (?, ?, ?)',
+                [
+                    (
+                        account_id or '',
+                        schedule.raw_data['date'],
+                        json.dumps(schedule.raw_data),
+                    )
+                    for schedule in schedules
+                ],
+            )
+        self.mark_synced(scope, from_date, to_date)
+        return True
@@ -0,0 +1,671 @@
+'''
+    Local stand-in for the Tempo and Jira endpoints used by the client,
+    for load tests and benchmarks that should not touch the real
+    services.
+
+        python -m tempo.stub_server --port 8000 --worklogs 100000 \\
+            --latency 0.05 --error-rate 0.05 --rate-limit-rate 0.05
+
+    Point the client at it by setting tempo.api_url and jira.url to the
+    printed URL in config.ini. In the same process,
+    config.tempo.load('api_url', url) overrides the value without
+    saving it.
+
+    Worklogs, schedules, issues and tokens are synthetic, the injected
+    faults follow --seed. Responses recorded from the real services
+    with --record can be replayed in place of them with --replay.
+'''
+import argparse
+import bisect
+import datetime
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = '%Y-%m-%d'
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Retry-After')
+
+
+def synthetic_worklog(
+    i: int, start: datetime.date = datetime.date(2019, 1, 1)
+) -> dict:
+    day = start + datetime.timedelta(days=i // 8)
+    issue_key = f'DUM-{i % 97 + 1}'
+    return {
+        'self': f'https://api.tempo.io/core/3/worklogs/{i}',
+        'tempoWorklogId': i,
+        'jiraWorklogId': 10000 + i,
+        'issue': {
+            'self': f'https://instance.atlassian.net/rest/api/2/issue/{i}',
+            'key': issue_key,
+        },
+        'timeSpentSeconds': 1800 * (i % 8 + 1),
+        'billableSeconds': 1800 * (i % 8 + 1),
+        'startDate': day.strftime(DATE_FORMAT),
+        'startTime': f'{8 + i % 8:02d}:{i % 60:02d}:00',
+        'description': f'Working on {issue_key}',
+        'createdAt': f'{day:%Y-%m-%d}T17:{i % 60:02d}:00Z',
+        'updatedAt': f'{day:%Y-%m-%d}T17:{i % 60:02d}:30Z',
+        'author': {
+            'self': 'https://instance.atlassian.net/rest/api/2/user?u=1',
+            'accountId': f'account-{i % 5}',
+            'displayName': f'User {i % 5}',
+        },
+        'attributes': {
+            'self': f'https://api.tempo.io/core/3/worklogs/{i}/attributes',
+            'values': [],
+        },
+    }
+
+
+class Response:
+    def __init__(self, status: int = 200, body=None, headers: dict = None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+
+class Faults:
+    '''
+        Latency and failures added to every response. Rates are the
+        chance of answering 429 or a 5xx instead of the real response.
+    '''
+    def __init__(
+        self,
+        latency: float = 0,
+        jitter: float = 0,
+        error_rate: float = 0,
+        rate_limit_rate: float = 0,
+        retry_after: float = 0,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def delay(self) -> float:
+        with self.lock:
+            return self.latency + self.random.uniform(0, self.jitter)
+
+    def failure(self):
+        with self.lock:
+            roll = self.random.random()
+            if roll < self.rate_limit_rate:
+                return Response(
+                    429,
+                    {'errors': [{'message': 'Rate limit exceeded'}]},
+                    {'Retry-After': f'{self.retry_after:g}'},
+                )
+            if roll < self.rate_limit_rate + self.error_rate:
+                status = self.random.choice((500, 502, 503, 504))
+                return Response(status, {'errors': [{'message': 'Stub'}]})
+        return None
+
+
+class Replay:
+    '''
+        Recorded responses, matched on method, path and query. Several
+        responses for the same request are served in turn, the last one
+        repeats.
+    '''
+    def __init__(self, entries: list = ()):
+        self.lock = threading.Lock()
+        self.entries = {}
+        for entry in entries:
+            self.entries.setdefault(self.key(entry), []).append(entry)
+
+    @classmethod
+    def load(cls, path: str) -> 'Replay':
+        with open(path) as f:
+            return cls(json.load(f)['responses'])
+
+    @staticmethod
+    def key(entry: dict) -> tuple:
+        return (
+            entry['method'].upper(),
+            entry['path'],
+            tuple(sorted(entry.get('query', {}).items())),
+        )
+
+    def get(self, method: str, path: str, query: dict):
+        key = (method, path, tuple(sorted(query.items())))
+        with self.lock:
+            responses = self.entries.get(key)
+            if not responses:
+                return None
+            entry = responses.pop(0) if len(responses) > 1 else responses[0]
+        return Response(
+            entry.get('status', 200),
+            entry.get('body'),
+            entry.get('headers'),
+        )
+
+
+SECRET_KEYS = ('token', 'access_token', 'refresh_token')
+PERSONAL_KEYS = ('displayName', 'emailAddress', 'avatarUrls')
+
+
+def pseudonym(account_id: str) -> str:
+    return f'account-{hashlib.sha256(account_id.encode()).hexdigest()[:12]}'
+
+
+class Recorder:
+    '''
+        Forwards requests to the real services and keeps the responses
+        for replaying later. The saved copies leave out the Authorization
+        header, tokens and personal details, and account ids are replaced
+        by stable pseudonyms wherever they appear.
+    '''
+    def __init__(
+        self,
+        path: str,
+        tempo_url: str,
+        jira_url: str = None,
+        app_url: str = 'https://app.tempo.io',
+    ):
+        self.path = path
+        self.tempo_url = tempo_url.rstrip('/')
+        self.jira_url = (jira_url or tempo_url).rstrip('/')
+        self.app_url = app_url.rstrip('/')
+        self.lock = threading.Lock()
+        self.responses = []
+        self.pseudonyms = {}
+
+    def upstream(self, path: str) -> str:
+        if path.startswith('/rest/api/'):
+            return self.jira_url
+        if path.startswith('/rest/jira/'):
+            # Instance search is served by the Tempo app, not the API.
+            return self.app_url
+        return self.tempo_url
+
+    def redact(self, value):
+        if isinstance(value, list):
+            return [self.redact(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        redacted = {}
+        for key, item in value.items():
+            if key in SECRET_KEYS or key in PERSONAL_KEYS:
+                item = 'redacted'
+            elif key == 'accountId' and isinstance(item, str):
+                self.pseudonyms.setdefault(item, pseudonym(item))
+            redacted[key] = self.redact(item)
+        return redacted
+
+    def forward(self, method, path, query, headers, body) -> Response:
+        url = f'{self.upstream(path)}{path}'
+        if query:
+            url = f'{url}?{urlencode(query)}'
+        request = urllib.request.Request(
+            url,
+            data=body or None,
+            method=method,
+            headers={
+                key: value for key, value in headers.items()
+                if key in ('Authorization', 'Content-Type')
+            },
+        )
+        try:
+            with urllib.request.urlopen(request) as r:
+                status, data, reply_headers = r.status, r.read(), r.headers
+        except urllib.error.HTTPError as e:
+            status, data, reply_headers = e.code, e.read(), e.headers
+        try:
+            data = json.loads(data) if data else None
+        except ValueError:
+            data = data.decode(errors='replace')
+        response = Response(status, data, {
+            key: reply_headers[key]
+            for key in RECORDED_HEADERS if key in reply_headers
+        })
+        with self.lock:
+            self.responses.append({
+                'method': method,
+                'path': path,
+                'query': query,
+                'status': status,
+                'headers': response.headers,
+                'body': self.redact(data),
+            })
+        return response
+
+    def save(self):
+        with self.lock:
+            recorded = json.dumps({'responses': self.responses}, indent=1)
+            # Account ids also appear in paths, queries and links.
+            for account_id, alias in self.pseudonyms.items():
+                recorded = recorded.replace(account_id, alias)
+            with open(self.path, 'w') as f:
+                f.write(recorded)
+
+
+class Dataset:
+    '''
+        Synthetic Tempo and Jira data. Worklogs are kept sorted by start
+        date, created and updated worklogs are stored.
+    '''
+    def __init__(
+        self,
+        worklogs: int = 1000,
+        issues: int = 97,
+        start: datetime.date = datetime.date(2019, 1, 1),
+        account_id: str = 'account-0',
+    ):
+        self.lock = threading.Lock()
+        self.worklogs = [synthetic_worklog(i, start) for i in range(worklogs)]
+        self.dates = [worklog['startDate'] for worklog in self.worklogs]
+        self.next_id = worklogs
+        self.issues = {
+            f'DUM-{i}': {
+                'id': str(10000 + i),
+                'key': f'DUM-{i}',
+                'fields': {
+                    'summary': f'Dummy issue {i}',
+                    'status': {'name': 'In Progress'},
+                },
+            }
+            for i in range(1, issues + 1)
+        }
+        self.user = {
+            'accountId': account_id,
+            'displayName': 'Stub User',
+            'emailAddress': 'stub@example.com',
+        }
+        self.tokens = 0
+
+    def find(self, from_date=None, to_date=None, account_id=None,
+             updated_from=None) -> list:
+        with self.lock:
+            low = bisect.bisect_left(self.dates, from_date or '')
+            high = (
+                bisect.bisect_right(self.dates, to_date)
+                if to_date else len(self.dates)
+            )
+            worklogs = self.worklogs[low:high]
+        if account_id:
+            worklogs = [
+                worklog for worklog in worklogs
+                if worklog['author']['accountId'] == account_id
+            ]
+        if updated_from:
+            worklogs = [
+                worklog for worklog in worklogs
+                if worklog['updatedAt'] >= updated_from
+            ]
+        return worklogs
+
+    def save_worklog(self, data: dict, worklog_id: int = None):
+        with self.lock:
+            if worklog_id is None:
+                worklog_id = self.next_id
+                self.next_id += 1
+            else:
+                index = self.index_of(worklog_id)
+                if index is None:
+                    return None
+                del self.worklogs[index]
+                del self.dates[index]
+            now = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            worklog = synthetic_worklog(worklog_id)
+            worklog.update({
+                'issue': {'key': data.get('issueKey')},
+                'timeSpentSeconds': data.get('timeSpentSeconds', 0),
+                'billableSeconds': data.get('billableSeconds', 0),
+                'startDate': data.get('startDate'),
+                'startTime': data.get('startTime', '00:00:00'),
+                'description': data.get('description', ''),
+                'createdAt': now,
+                'updatedAt': now,
+            })
+            worklog['author'] = dict(
+                worklog['author'],
+                accountId=data.get('authorAccountId'),
+            )
+            index = bisect.bisect_right(self.dates, worklog['startDate'])
+            self.worklogs.insert(index, worklog)
+            self.dates.insert(index, worklog['startDate'])
+            return worklog
+
+    def index_of(self, worklog_id: int):
+        for index, worklog in enumerate(self.worklogs):
+            if worklog['tempoWorklogId'] == worklog_id:
+                return index
+        return None
+
+    def schedules(self, from_date: str, to_date: str) -> list:
+        day = datetime.datetime.strptime(from_date, DATE_FORMAT).date()
+        last = datetime.datetime.strptime(to_date, DATE_FORMAT).date()
+        results = []
+        while day <= last:
+            working = day.weekday() < 5
+            results.append({
+                'date': day.strftime(DATE_FORMAT),
+                'requiredSeconds': 27000 if working else 0,
+                'type': 'WORKING_DAY' if working else 'NON_WORKING_DAY',
+            })
+            day += datetime.timedelta(1)
+        return results
+
+    def token(self) -> dict:
+        with self.lock:
+            self.tokens += 1
+            token = f'stub-jira-token-{self.tokens}'
+        return {'token': token, 'expiresAt': int(time.time()) + 60 * 60}
+
+
+class Stub:
+    '''
+        Routes requests to recorded or synthetic responses. Lists are
+        paginated like Tempo does: limit is capped at max_limit and
+        metadata.next links to the following page.
+    '''
+    def __init__(
+        self,
+        dataset: Dataset = None,
+        faults: Faults = None,
+        replay: Replay = None,
+        recorder: Recorder = None,
+        max_limit: int = 1000,
+    ):
+        self.dataset = dataset or Dataset()
+        self.faults = faults or Faults()
+        self.replay = replay
+        self.recorder = recorder
+        self.max_limit = max_limit
+        self.url = None
+        self.routes = [
+            ('GET', r'/core/3/worklogs/account/(?P<account_id>[^/]+)',
+             self.get_worklogs),
+            ('GET', r'/core/3/worklogs', self.get_worklogs),
+            ('POST', r'/core/3/worklogs', self.save_worklog),
+            ('PUT', r'/core/3/worklogs/(?P<worklog_id>\d+)',
+             self.save_worklog),
+            ('GET', r'/core/3/user-schedule(/[^/]+)?', self.user_schedule),
+            ('GET', r'/jira/v1/get-jira-oauth-token/?', self.jira_token),
+            ('GET', r'/rest/jira/client/search/?', self.instances),
+            ('GET', r'/rest/api/3/myself', self.myself),
+            ('GET', r'/rest/api/3/issue/picker', self.issue_picker),
+            ('GET', r'/rest/api/3/issue/(?P<key>[^/]+)', self.issue),
+            ('GET', r'/rest/api/3/search', self.search),
+        ]
+        self.routes = [
+            (method, re.compile(f'{pattern}$'), handler)
+            for method, pattern, handler in self.routes
+        ]
+
+    def handle(self, method, path, query, headers, body) -> Response:
+        failure = self.faults.failure()
+        if failure is not None:
+            return failure
+        if self.recorder is not None:
+            return self.recorder.forward(method, path, query, headers, body)
+        if self.replay is not None:
+            response = self.replay.get(method, path, query)
+            if response is not None:
+                return response
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match and route_method == method:
+                data = json.loads(body) if body else None
+                return handler(query, data, **match.groupdict())
+        return Response(404, {'errors': [{'message': f'No stub for {path}'}]})
+
+    def page(self, results: list, query: dict, path: str) -> Response:
+        offset = int(query.get('offset', 0))
+        limit = min(int(query.get('limit', 50)), self.max_limit)
+        page = results[offset:offset + limit]
+        metadata = {'count': len(page), 'offset': offset, 'limit': limit}
+        if offset + limit < len(results):
+            metadata['next'] = f'{self.url}{path}?' + urlencode(
+                dict(query, offset=offset + limit, limit=limit)
+            )
+        if offset > 0:
+            metadata['previous'] = f'{self.url}{path}?' + urlencode(
+                dict(query, offset=max(offset - limit, 0), limit=limit)
+            )
+        return Response(200, {'metadata': metadata, 'results': page})
+
+    def get_worklogs(self, query, data, account_id=None):
+        results = self.dataset.find(
+            from_date=query.get('from'),
+            to_date=query.get('to'),
+            account_id=account_id,
+            updated_from=query.get('updatedFrom'),
+        )
+        path = '/core/3/worklogs'
+        if account_id:
+            path = f'{path}/account/{account_id}'
+        return self.page(results, query, path)
+
+    def save_worklog(self, query, data, worklog_id=None):
+        if not data or not data.get('issueKey') or not data.get('startDate'):
+            return Response(400, {'errors': [{'message': 'Missing fields'}]})
+        if worklog_id is not None:
+            worklog_id = int(worklog_id)
+        worklog = self.dataset.save_worklog(data, worklog_id)
+        if worklog is None:
+            return Response(404, {'errors': [{'message': 'No worklog'}]})
+        return Response(200, worklog)
+
+    def user_schedule(self, query, data):
+        today = datetime.date.today().strftime(DATE_FORMAT)
+        results = self.dataset.schedules(
+            query.get('from', today), query.get('to', today)
+        )
+        return Response(200, {
+            'metadata': {'count': len(results)},
+            'results': results,
+        })
+
+    def jira_token(self, query, data):
+        return Response(200, self.dataset.token())
+
+    def instances(self, query, data):
+        return Response(200, {'path': self.url})
+
+    def myself(self, query, data):
+        return Response(200, self.dataset.user)
+
+    def issue(self, query, data, key):
+        issue = self.dataset.issues.get(key)
+        if issue is None:
+            return Response(404, {'errorMessages': ['Issue does not exist']})
+        return Response(200, issue)
+
+    def search(self, query, data):
+        keys = re.findall(r'[A-Z][A-Z0-9_]*-\d+', query.get('jql', ''))
+        issues = [
+            self.dataset.issues[key] for key in keys
+            if key in self.dataset.issues
+        ]
+        start_at = int(query.get('startAt', 0))
+        max_results = int(query.get('maxResults', 50))
+        return Response(200, {
+            'startAt': start_at,
+            'maxResults': max_results,
+            'total': len(issues),
+            'issues': issues[start_at:start_at + max_results],
+        })
+
+    def issue_picker(self, query, data):
+        search = query.get('query', '').lower()
+        issues = [
+            {
+                'key': issue['key'],
+                'summaryText': issue['fields']['summary'],
+                'img': '',
+            }
+            for issue in self.dataset.issues.values()
+            if search in issue['key'].lower()
+            or search in issue['fields']['summary'].lower()
+        ]
+        return Response(200, {'sections': [
+            {'label': 'Current Search', 'issues': issues[:20]},
+        ]})
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes, which would otherwise wait
+    # for the client's delayed ACK.
+    disable_nagle_algorithm = True
+    stub = None
+
+    def respond(self):
+        url = urlparse(self.path)
+        query = dict(parse_qsl(url.query))
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+        delay = self.stub.faults.delay()
+        if delay:
+            time.sleep(delay)
+        response = self.stub.handle(
+            self.command, url.path, query, self.headers, body
+        )
+        data = b''
+        if response.body is not None:
+            data = json.dumps(response.body).encode()
+        headers = dict(response.headers)
+        if response.status == 200 and self.command == 'GET':
+            etag = headers.setdefault(
+                'ETag', f'"{hashlib.sha1(data).hexdigest()}"'
+            )
+            if self.headers.get('If-None-Match') == etag:
+                response.status, data = 304, b''
+        self.send_response(response.status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        if data and 'Content-Type' not in headers:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = respond
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+class StubServer:
+    '''
+        Runs a Stub on a background thread.
+
+            with StubServer(Stub(Dataset(worklogs=10000))) as server:
+                tempo.base_url = server.url
+    '''
+    def __init__(self, stub: Stub = None, host='127.0.0.1', port=0):
+        self.stub = stub or Stub()
+        handler = type('Handler', (StubHandler,), {'stub': self.stub})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.url = f'http://{host}:{self.server.server_port}'
+        self.stub.url = self.url
+        self.thread = None
+
+    def start(self) -> 'StubServer':
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.thread is not None:
+            self.server.shutdown()
+            self.thread = None
+        self.server.server_close()
+        if self.stub.recorder is not None:
+            self.stub.recorder.save()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog='python -m tempo.stub_server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--worklogs', type=int, default=1000,
+                        help='Number of synthetic worklogs')
+    parser.add_argument('--issues', type=int, default=97)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-limit', type=int, default=1000,
+                        help='Largest page size served')
+    parser.add_argument('--latency', type=float, default=0,
+                        help='Seconds added to each response')
+    parser.add_argument('--jitter', type=float, default=0,
+                        help='Up to this many more seconds, at random')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='Share of requests answered with a 5xx')
+    parser.add_argument('--rate-limit-rate', type=float, default=0,
+                        help='Share of requests answered with a 429')
+    parser.add_argument('--retry-after', type=float, default=0)
+    parser.add_argument('--replay', help='Serve responses from this file')
+    parser.add_argument('--record', help='Forward requests to the '
+                        'upstreams and save the responses here on Ctrl-C')
+    parser.add_argument('--tempo-upstream', default='https://api.tempo.io')
+    parser.add_argument('--app-upstream', default='https://app.tempo.io',
+                        help='Tempo app url, for the instance search')
+    parser.add_argument('--jira-upstream',
+                        help='Jira url, like https://example.atlassian.net')
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    stub = Stub(
+        dataset=Dataset(worklogs=args.worklogs, issues=args.issues),
+        faults=Faults(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            retry_after=args.retry_after,
+            seed=args.seed,
+        ),
+        replay=Replay.load(args.replay) if args.replay else None,
+        recorder=(
+            Recorder(
+                args.record,
+                args.tempo_upstream,
+                args.jira_upstream,
+                args.app_upstream,
+            )
+            if args.record else None
+        ),
+        max_limit=args.max_limit,
+    )
+    server = StubServer(stub, host=args.host, port=args.port)
+    print(f'Serving Tempo and Jira on {server.url}')
+    print(f'Set tempo.api_url and jira.url to {server.url} to use it')
+    server.start()
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
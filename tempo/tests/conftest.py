@@ -0,0 +1,65 @@
+import pytest
+
+from tempo.api import http_cache as http_cache_module
+from tempo.api import tokens
+from tempo.api.http_cache import DiskCache
+
+
+@pytest.fixture
+def worklog_data():
+    return {
+        'self': 'https://api.tempo.io/2/worklogs/12600',
+        'tempoWorklogId': 126,
+        'jiraWorklogId': 10100,
+        'issue': {
+            'self': 'https://instance.atlassian.net/rest/api/2/issue/DUM-1',
+            'key': 'DUM-1'
+        },
+        'timeSpentSeconds': 3600,
+        'billableSeconds': 5200,
+        'startDate': '2017-02-06',
+        'startTime': '20:06:00',
+        'description': (
+            'Investigating a problem with our external database system'
+        ),
+        'createdAt': '2017-02-06T16:41:41Z',
+        'updatedAt': '2017-02-06T16:41:42Z',
+        'author': {
+            'self': (
+                'https://instance.atlassian.net/rest/api/2/user?username=johnb'
+            ),
+            'accountId': '41321:32521-531-53151j51-51341',
+            'displayName': 'John Brown'
+        },
+        'attributes': {
+            'self': (
+                'https://api.tempo.io/2/worklogs/126/work-attribute-values'
+            ),
+            'values': [
+                {
+                    'key': '_DELIVERED_',
+                    'value': True
+                },
+                {
+                    'key': '_EXTERNALREF_',
+                    'value': 'EXT-44556'
+                },
+                {
+                    'key': '_COLOR_',
+                    'value': 'red'
+                }
+            ]
+        }
+    }
+
+
+@pytest.fixture(autouse=True)
+def http_cache(tmpdir, monkeypatch):
+    cache = DiskCache(str(tmpdir.join('http')))
+    monkeypatch.setattr(http_cache_module, 'default_cache', cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def token_dir(tmpdir, monkeypatch):
+    monkeypatch.setattr(tokens, 'TOKEN_DIR', str(tmpdir.join('tokens')))
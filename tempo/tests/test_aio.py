@@ -0,0 +1,140 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from tempo.api.aio import AsyncTempo, AsyncJira  # noqa: E402
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    throttled = set()
+    token_requests = 0
+
+    def reply(self, status, data, headers={}):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        cls = StubHandler
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            time.sleep(0.02)
+            self.route()
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        data = json.loads(self.rfile.read(length))
+        self.reply(200, dict(self.server.worklog, **{
+            'description': data['description'],
+            'author': {'accountId': data['authorAccountId'],
+                       'displayName': 'Stub'},
+        }))
+
+    def route(self):
+        if self.path.startswith('/core/3/worklogs'):
+            if self.path not in StubHandler.throttled:
+                StubHandler.throttled.add(self.path)
+                return self.reply(429, {}, {'Retry-After': '0'})
+            return self.reply(200, {
+                'metadata': {'count': 1, 'offset': 0, 'limit': 200},
+                'results': [self.server.worklog],
+            })
+        if self.path.startswith('/jira/v1/get-jira-oauth-token/'):
+            StubHandler.token_requests += 1
+            return self.reply(200, {'token': 'jira', 'expiresAt': 0})
+        if self.path.startswith('/rest/api/3/myself'):
+            return self.reply(200, {
+                'accountId': 'stub-account', 'displayName': 'Stub'
+            })
+        if self.path.startswith('/rest/api/3/issue/'):
+            return self.reply(401, {'message': 'unauthorized'})
+        self.reply(404, {'message': 'not found'})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url(worklog_data):
+    StubHandler.max_in_flight = 0
+    StubHandler.throttled = set()
+    StubHandler.token_requests = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.worklog = worklog_data
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+
+
+def test_concurrent_worklogs_are_bounded(stub_url):
+    async def run():
+        async with AsyncTempo('token', concurrency=3) as tempo:
+            tempo.base_url = stub_url
+            pages = await asyncio.gather(*(
+                tempo.worklogs(offset=i) for i in range(12)
+            ))
+        return pages
+
+    pages = asyncio.run(run())
+    assert [page[0].id for page in pages] == [126] * 12
+    assert StubHandler.max_in_flight <= 3
+
+
+def test_update_worklog_resolves_author(stub_url, monkeypatch):
+    monkeypatch.setattr(AsyncJira, 'base_url', stub_url)
+
+    async def run():
+        async with AsyncTempo('token') as tempo:
+            tempo.base_url = stub_url
+            return await asyncio.gather(*(
+                tempo.update_worklog(
+                    issue_key='DUM-1', description='async', time_spent=60
+                )
+                for _ in range(3)
+            ))
+
+    worklogs = asyncio.run(run())
+    assert [worklog.description for worklog in worklogs] == ['async'] * 3
+    assert worklogs[0].author.account_id == 'stub-account'
+    assert StubHandler.token_requests == 1
+
+
+def test_errors_carry_the_status(stub_url, monkeypatch):
+    monkeypatch.setattr(AsyncJira, 'base_url', stub_url)
+
+    async def run():
+        async with AsyncTempo('token') as tempo:
+            tempo.base_url = stub_url
+            jira = await AsyncJira.auth_by_tempo(tempo)
+            with pytest.raises(AsyncJira.ApiError) as e:
+                await jira.issue('DUM-1')
+        return e.value
+
+    assert asyncio.run(run()).status_code == 401
+
+
+def test_worklogs_query_matches_blocking_client():
+    _, params = AsyncTempo('token').worklogs_query(
+        None, None, None, '2019-01-03', 0, 10
+    )
+    assert params['updatedFrom'] == '2019-01-03'
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import pytest
+
+from tempo.api import Tempo
+from tempo_cli import auth
+
+
+def api_error(status_code):
+    error = Exception(str(status_code))
+    error.response = SimpleNamespace(status_code=status_code)
+    return Tempo.ApiError(error, 'error')
+
+
+@pytest.fixture
+def validations(tmpdir, monkeypatch):
+    monkeypatch.setattr(
+        auth, 'VALIDATIONS_FILE', str(tmpdir.join('validations.json'))
+    )
+    calls = []
+
+    def worklogs(self, **kwargs):
+        calls.append(self.headers['Authorization'])
+        if self.headers['Authorization'] == 'Bearer bad':
+            raise api_error(401)
+        if self.headers['Authorization'] == 'Bearer unlucky':
+            raise api_error(503)
+        return []
+
+    monkeypatch.setattr(Tempo, 'worklogs', worklogs)
+    return calls
+
+
+def test_validation_is_cached(validations):
+    assert auth.cached_validation('good') is None
+    assert auth.validate_access_token('good')
+    assert auth.validate_access_token('good')
+    assert not auth.validate_access_token('bad')
+    assert not auth.validate_access_token('bad')
+    assert validations == ['Bearer good', 'Bearer bad']
+
+
+def test_validation_expires(validations, monkeypatch):
+    auth.validate_access_token('good')
+    later = auth.time.time() + 2 * 24 * 60 * 60
+    monkeypatch.setattr(auth.time, 'time', lambda: later)
+    assert auth.cached_validation('good') is None
+
+
+def test_server_errors_are_not_cached(validations):
+    assert not auth.validate_access_token('unlucky')
+    assert auth.cached_validation('unlucky') is None
+    assert not auth.validate_access_token('unlucky')
+    assert validations == ['Bearer unlucky', 'Bearer unlucky']
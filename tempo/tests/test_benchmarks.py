@@ -0,0 +1,24 @@
+import curses
+
+import pytest
+
+# The benchmarks are not installed with the package, only in a checkout.
+suite = pytest.importorskip('benchmarks.suite')
+
+
+def test_compare_reports_regressions(tmpdir):
+    path = str(tmpdir.join('baseline.json'))
+    suite.save({'fast': 1.0, 'slow': 1.0}, path)
+    regressions = suite.compare(
+        {'fast': 1.05, 'slow': 1.5, 'new': 2.0}, path, threshold=0.1
+    )
+    assert regressions == ['slow']
+
+
+def test_cases_run(monkeypatch):
+    color_pair = curses.color_pair
+    import benchmarks.cases  # noqa: F401
+    monkeypatch.setattr(suite, 'measure', lambda f, repeat: f() or 1.0)
+    results = suite.run('worklogs=10]', repeat=1)
+    assert results == {'ui.my_work_display[worklogs=10]': 1.0}
+    assert curses.color_pair is color_pair
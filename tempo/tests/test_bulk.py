@@ -0,0 +1,105 @@
+import threading
+
+from tempo.api import bulk
+from tempo.api.api import Tempo
+
+
+class FakeTempo(Tempo):
+    def __init__(self, fail_issues=()):
+        super().__init__('token')
+        self.fail_issues = set(fail_issues)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def update_worklog(self, **kwargs):
+        with self.lock:
+            self.calls.append(kwargs)
+        if kwargs['issue_key'] in self.fail_issues:
+            raise self.ApiError(Exception('400'), 'Issue does not exist')
+        worklog = type('Worklog', (), {})()
+        worklog.id = len(self.calls)
+        return worklog
+
+
+def items(count):
+    return [
+        {'issue_key': f'DUM-{i}', 'time_spent': 3600}
+        for i in range(count)
+    ]
+
+
+def test_author_is_resolved_once(monkeypatch):
+    resolved = []
+    monkeypatch.setattr(
+        bulk, 'resolve_author', lambda tempo: resolved.append(1) or 'me'
+    )
+    tempo = FakeTempo()
+    results = list(bulk.update_worklogs(tempo, items(50), workers=4))
+    assert len(results) == 50
+    assert all(result.ok for result in results)
+    assert resolved == [1]
+    assert {call['author_account_id'] for call in tempo.calls} == {'me'}
+
+
+def test_author_failure_is_resolved_once(monkeypatch):
+    resolved = []
+
+    def resolve_author(tempo):
+        resolved.append(1)
+        raise Tempo.ApiError(Exception('401'), 'Unauthorized')
+    monkeypatch.setattr(bulk, 'resolve_author', resolve_author)
+    tempo = FakeTempo()
+    results = list(bulk.update_worklogs(tempo, items(20), workers=4))
+    assert [result.error for result in results] == ['Unauthorized'] * 20
+    assert resolved == [1]
+    assert tempo.calls == []
+
+
+def test_partial_failure_and_resume(tmpdir):
+    journal = str(tmpdir.join('journal.ndjson'))
+    tempo = FakeTempo(fail_issues={'DUM-3'})
+    results = list(bulk.update_worklogs(
+        tempo, items(10), author_account_id='me', journal=journal
+    ))
+    failed = [result for result in results if not result.ok]
+    assert [result.index for result in failed] == [3]
+    assert failed[0].error == 'Issue does not exist'
+
+    tempo = FakeTempo()
+    results = list(bulk.update_worklogs(
+        tempo, items(10), author_account_id='me', journal=journal
+    ))
+    assert [result.index for result in results] == [3]
+    assert [call['issue_key'] for call in tempo.calls] == ['DUM-3']
+
+
+def test_bad_rows_fail_alone(tmpdir, capsys):
+    from tempo_cli.bulk import run_bulk
+    path = tmpdir.join('worklogs.csv')
+    path.write(
+        'issue_key,time_spent,author_account_id\n'
+        'DUM-1,30m,me\n'
+        'DUM-2,soon,me\n'
+        'DUM-3,"1,5h",me\n'
+        'DUM-4,3600s,me\n'
+    )
+    tempo = FakeTempo()
+    assert run_bulk(tempo, str(path), workers=2) == 1
+    assert sorted(
+        (call['issue_key'], call['time_spent']) for call in tempo.calls
+    ) == [('DUM-1', 1800), ('DUM-3', 5400), ('DUM-4', 3600)]
+    assert all(
+        call['billable'] == call['time_spent'] for call in tempo.calls
+    )
+    out, err = capsys.readouterr()
+    assert "Row 1 failed: Invalid duration 'soon'" in err
+    assert '3 worklogs written, 1 failed' in out
+
+
+def test_durations_read_like_the_worklog_form():
+    from tempo_cli.bulk import parse_duration
+    assert parse_duration('8') == 8 * 3600
+    assert parse_duration('7.5') == parse_duration('7,5') == 7.5 * 3600
+    assert parse_duration(2) == 2 * 3600
+    assert parse_duration('1h 30m') == parse_duration('90m') == 5400
+    assert parse_duration('45s') == 45
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from tempo.config import Config, get_disk_config
+
+
+@pytest.fixture
+def path(tmpdir):
+    return str(tmpdir.join('tempo-cli', 'config.ini'))
+
+
+def open_config(path):
+    return Config(get_disk_config(path), path=path)
+
+
+def test_transaction_saves_once(path, monkeypatch):
+    config = open_config(path)
+    writes = []
+    write = Config.write
+    monkeypatch.setattr(
+        Config, 'write', lambda self, cfg: writes.append(write(self, cfg))
+    )
+    with config.transaction():
+        config.tempo.access_token = 'access'
+        config.tempo.refresh_token = 'refresh'
+    assert len(writes) == 1
+    reopened = open_config(path)
+    assert reopened.tempo.access_token == 'access'
+    assert reopened.tempo.refresh_token == 'refresh'
+    assert sorted(os.listdir(os.path.dirname(path))) == [
+        'config.ini', 'config.ini.lock',
+    ]
+
+
+def test_failed_transaction_is_rolled_back(path):
+    config = open_config(path)
+    config.tempo.access_token = 'kept'
+    with pytest.raises(RuntimeError):
+        with config.transaction():
+            config.tempo.access_token = 'dropped'
+            raise RuntimeError()
+    assert config.tempo.access_token == 'kept'
+    assert open_config(path).tempo.access_token == 'kept'
+
+
+def test_concurrent_changes_are_merged(path):
+    first = open_config(path)
+    second = open_config(path)
+    first.tempo.access_token = 'access'
+    second.jira.url = 'https://example.atlassian.net'
+    assert second.tempo.access_token == 'access'
+    merged = open_config(path)
+    assert merged.tempo.access_token == 'access'
+    assert merged.jira.url == 'https://example.atlassian.net'
+
+
+def test_reload_when_file_changes(path):
+    reader = open_config(path)
+    writer = open_config(path)
+    writer.tempo.first_day_of_week = 6
+    reader.reload_if_changed(force=True)
+    assert reader.tempo.first_day_of_week == '6'
@@ -0,0 +1,176 @@
+import threading
+import time
+
+import pytest
+
+from tempo.api import decorators
+from tempo.api.cache import LRUCache
+from tempo.api.decorators import api_request
+
+
+class Client:
+    def __init__(self, identity):
+        self.identity = identity
+        self.calls = []
+
+    @api_request(cache=True)
+    def issue(self, key, expand=None):
+        self.calls.append(key)
+        return f'{self.identity}:{key}'
+
+    @api_request(cache=True, ttl=0.05)
+    def schedules(self):
+        self.calls.append('schedules')
+        return len(self.calls)
+
+
+@pytest.fixture(autouse=True)
+def result_cache(monkeypatch):
+    cache = LRUCache(maxsize=4)
+    monkeypatch.setattr(decorators, 'result_cache', cache)
+    return cache
+
+
+def test_positional_arguments_are_part_of_the_key():
+    client = Client('a')
+    assert client.issue('A-1') == 'a:A-1'
+    assert client.issue('A-2') == 'a:A-2'
+    assert client.issue(key='A-1') == 'a:A-1'
+    assert client.calls == ['A-1', 'A-2']
+
+
+def test_clients_do_not_share_entries():
+    assert Client('a').issue('A-1') == 'a:A-1'
+    assert Client('b').issue('A-1') == 'b:A-1'
+
+
+def test_lru_eviction_and_stats(result_cache):
+    client = Client('a')
+    for i in range(6):
+        client.issue(f'A-{i}')
+    client.issue('A-5')
+    stats = result_cache.stats()
+    assert stats['size'] == 4
+    assert stats['evictions'] == 2
+    assert stats['hits'] == 1
+    client.issue('A-0')
+    assert client.calls.count('A-0') == 2
+
+
+def test_ttl_expires_entries():
+    client = Client('a')
+    assert client.schedules() == 1
+    assert client.schedules() == 1
+    time.sleep(0.06)
+    assert client.schedules() == 2
+
+
+def test_invalidate():
+    a, b = Client('a'), Client('b')
+    a.issue('A-1')
+    b.issue('A-1')
+    Client.issue.invalidate(instance=a)
+    a.issue('A-1')
+    b.issue('A-1')
+    assert a.calls == ['A-1', 'A-1']
+    assert b.calls == ['A-1']
+
+
+def test_callback_receives_cached_result():
+    client = Client('a')
+    client.issue('A-1')
+    received = []
+    client.issue('A-1', callback=received.append)
+    assert received == ['a:A-1']
+
+
+def test_callback_fills_cache():
+    client = Client('a')
+    done = threading.Event()
+    client.issue('A-1', callback=lambda result: done.set())
+    assert done.wait(1)
+    client.issue('A-1')
+    assert client.calls == ['A-1']
+
+
+class SlowClient:
+    identity = 'slow'
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    @api_request
+    def worklogs(self, week):
+        self.calls += 1
+        self.release.wait(1)
+        return f'week {week}'
+
+    @api_request(coalesce=False)
+    def update(self, week):
+        self.calls += 1
+        self.release.wait(1)
+        return week
+
+
+def test_concurrent_identical_calls_are_coalesced():
+    client = SlowClient()
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(client.worklogs(1)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    received = []
+    client.worklogs(1, callback=received.append)
+    time.sleep(0.05)
+    client.release.set()
+    for thread in threads:
+        thread.join()
+    time.sleep(0.05)
+    assert client.calls == 1
+    assert results == ['week 1'] * 5
+    assert received == ['week 1']
+    assert len(decorators.in_flight) == 0
+
+
+def test_errors_are_shared_with_waiting_callers():
+    class Failing:
+        identity = 'failing'
+
+        @api_request
+        def worklogs(self):
+            time.sleep(0.05)
+            raise ValueError('boom')
+
+    client = Failing()
+    errors = []
+
+    def call():
+        try:
+            client.worklogs()
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3
+    assert len(decorators.in_flight) == 0
+
+
+def test_non_idempotent_calls_are_not_coalesced():
+    client = SlowClient()
+    client.release.set()
+    threads = [
+        threading.Thread(target=client.update, args=(1, ))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert client.calls == 3
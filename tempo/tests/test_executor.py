@@ -0,0 +1,56 @@
+import threading
+
+from tempo.api.executor import RequestExecutor
+
+
+def test_latest_request_wins():
+    executor = RequestExecutor(max_workers=1)
+    gate = threading.Event()
+    started = threading.Event()
+    received = []
+    done = threading.Event()
+
+    def fetch(week):
+        started.set()
+        gate.wait(1)
+        return week
+
+    first = executor.submit(
+        fetch, 1, callback=received.append, supersede='week'
+    )
+    assert started.wait(1)
+    queued = executor.submit(
+        fetch, 2, callback=received.append, supersede='week'
+    )
+    assert executor.queue_depth == 1
+    executor.submit(
+        fetch, 3,
+        callback=lambda week: (received.append(week), done.set()),
+        supersede='week',
+    )
+    assert queued.cancelled()
+    gate.set()
+    assert done.wait(1)
+    assert first.result() == 1
+    assert received == [3]
+    assert executor.queue_depth == 0
+    executor.shutdown()
+
+
+def test_errors_go_to_error_callback():
+    executor = RequestExecutor(max_workers=2)
+    errors = []
+    done = threading.Event()
+
+    def fail():
+        raise ValueError('boom')
+
+    executor.submit(
+        fail,
+        callback=lambda result: None,
+        error_callback=lambda e: (errors.append(e), done.set()),
+    )
+    assert done.wait(1)
+    assert isinstance(errors[0], ValueError)
+    executor.submit(lambda: 1, callback=lambda result: None).result()
+    executor.shutdown()
@@ -0,0 +1,71 @@
+import datetime
+
+import pytest
+
+from tempo import frame
+from tempo.api.models import Worklog
+from tempo.frame import WorklogFrame
+
+BACKENDS = [
+    'python',
+    pytest.param('numpy', marks=pytest.mark.skipif(
+        frame.get_numpy() is None, reason='numpy is not installed'
+    )),
+]
+
+
+def record(worklog_data, worklog_id, issue, author, start, seconds):
+    data = dict(
+        worklog_data,
+        tempoWorklogId=worklog_id,
+        issue={'key': issue},
+        author={'accountId': author},
+        startDate=start[:10],
+        startTime=start[11:],
+        timeSpentSeconds=seconds,
+        billableSeconds=seconds // 2,
+    )
+    return Worklog(data)
+
+
+@pytest.fixture
+def worklogs(worklog_data):
+    return [
+        record(worklog_data, 1, 'DUM-1', 'a', '2019-01-01 09:00:00', 3600),
+        record(worklog_data, 2, 'DUM-2', 'a', '2019-01-01 23:59:59', 1800),
+        record(worklog_data, 3, 'OTH-1', 'b', '2019-01-02 00:00:00', 900),
+        record(worklog_data, 4, 'DUM-1', 'b', '2019-01-03 12:00:00', 600),
+    ]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_group_by_matches_worklog_objects(worklogs, backend):
+    frame = WorklogFrame.from_worklogs(worklogs, backend=backend)
+    by_day = {}
+    for worklog in worklogs:
+        by_day.setdefault(worklog.started.date(), 0)
+        by_day[worklog.started.date()] += worklog.time_spent.total_seconds()
+    assert frame.group_by('day') == by_day
+    assert frame.group_by('issue') == {
+        'DUM-1': 4200, 'DUM-2': 1800, 'OTH-1': 900,
+    }
+    assert frame.group_by('project') == {'DUM': 6000, 'OTH': 900}
+    assert frame.group_by('author', column='billable') == {
+        'a': 2700, 'b': 750,
+    }
+    assert frame.group_by(('author', 'day')) == {
+        ('a', datetime.date(2019, 1, 1)): 5400,
+        ('b', datetime.date(2019, 1, 2)): 900,
+        ('b', datetime.date(2019, 1, 3)): 600,
+    }
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_between_is_inclusive(worklogs, backend):
+    frame = WorklogFrame.from_worklogs(worklogs, backend=backend)
+    week = frame.between(datetime.date(2019, 1, 1), datetime.date(2019, 1, 2))
+    assert list(week['id']) == [1, 2, 3]
+    assert week.total() == 6300
+    assert frame.between(
+        datetime.date(2019, 2, 1), datetime.date(2019, 2, 2)
+    ).group_by('day') == {}
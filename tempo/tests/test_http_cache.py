@@ -0,0 +1,137 @@
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tempo.api import Tempo, Jira
+
+
+class ConditionalHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    etag = '"v1"'
+    requests = []
+
+    def reply(self, status, data=None, headers={}):
+        body = json.dumps(data).encode() if data is not None else b''
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        cls = ConditionalHandler
+        cls.requests.append((self.path, self.headers.get('If-None-Match')))
+        if self.headers.get('If-None-Match') == cls.etag:
+            return self.reply(304)
+        self.reply(
+            200,
+            {'accountId': 'stub', 'displayName': cls.etag},
+            {'ETag': cls.etag},
+        )
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.reply(200, {})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    ConditionalHandler.requests = []
+    ConditionalHandler.etag = '"v1"'
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ConditionalHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+
+
+def make_jira(url):
+    tempo = Tempo('tempo-token')
+    tempo.base_url = url
+    jira = Jira('jira-token', expires=None, tempo=tempo)
+    jira.base_url = url
+    return tempo, jira
+
+
+def test_fresh_entries_skip_the_network(stub_url):
+    tempo, jira = make_jira(stub_url)
+    assert jira.get('/rest/api/3/myself')['accountId'] == 'stub'
+    # A new process with a new Jira token for the same Tempo user
+    tempo, jira = make_jira(stub_url)
+    assert jira.get('/rest/api/3/myself')['accountId'] == 'stub'
+    assert len(ConditionalHandler.requests) == 1
+
+
+def test_stale_entries_are_revalidated(stub_url, http_cache):
+    http_cache.ttls = [(p, 0) for p, ttl in http_cache.ttls]
+    tempo, jira = make_jira(stub_url)
+    jira.get('/rest/api/3/myself')
+    time.sleep(0.01)
+    assert jira.get('/rest/api/3/myself')['displayName'] == '"v1"'
+    assert ConditionalHandler.requests[-1] == ('/rest/api/3/myself', '"v1"')
+
+    ConditionalHandler.etag = '"v2"'
+    assert jira.get('/rest/api/3/myself')['displayName'] == '"v2"'
+
+
+def test_writes_invalidate_entries(stub_url, http_cache):
+    http_cache.ttls.append((re.compile('^/core/3/worklogs'), 60))
+    tempo, jira = make_jira(stub_url)
+    jira.get('/rest/api/3/issue/DUM-1')
+    tempo.get('/core/3/worklogs')
+    assert len(http_cache.entries()) == 2
+    tempo.post('/core/3/worklogs', json={})
+    assert [
+        http_cache.entry_path(entry.name) for entry in http_cache.entries()
+    ] == ['/rest/api/3/issue/DUM-1']
+    tempo.get('/core/3/worklogs')
+    jira.get('/rest/api/3/issue/DUM-1')
+    assert len(ConditionalHandler.requests) == 3
+
+
+def test_issue_searches_are_not_cached(stub_url, http_cache):
+    tempo, jira = make_jira(stub_url)
+    jira.get('/rest/api/3/issue/picker', params={'query': 'dum'})
+    jira.get('/rest/api/3/issue/picker', params={'query': 'dum'})
+    assert len(ConditionalHandler.requests) == 2
+    assert http_cache.entries() == []
+
+
+def test_invalidation_does_not_read_entries(
+    stub_url, http_cache, monkeypatch
+):
+    http_cache.ttls.append((re.compile('^/core/3/worklogs'), 60))
+    tempo, jira = make_jira(stub_url)
+    tempo.get('/core/3/worklogs')
+    jira.get('/rest/api/3/myself')
+    for entry in http_cache.entries():
+        with open(entry.path, 'w') as f:
+            f.write('not json')
+    tempo.post('/core/3/worklogs', json={})
+    tempo.get('/core/3/worklogs')
+
+    def scandir(path):
+        raise AssertionError('Listed the cache directory')
+    monkeypatch.setattr(os, 'scandir', scandir)
+    tempo.post('/core/3/worklogs', json={})
+    monkeypatch.undo()
+    assert [
+        http_cache.entry_path(entry.name) for entry in http_cache.entries()
+    ] == ['/rest/api/3/myself']
+
+
+def test_size_limit(http_cache):
+    http_cache.max_bytes = 1000
+    for i in range(20):
+        http_cache.set(str(i), '/rest/api/3/myself', 'x' * 100, 60)
+    entries = http_cache.entries()
+    assert sum(entry.stat().st_size for entry in entries) <= 1000
@@ -0,0 +1,38 @@
+from tempo_cli.issue_index import IssueIndex
+
+
+def make_index():
+    index = IssueIndex()
+    index.add('DUM-1', 'Investigate database problem', used_at=1)
+    index.add('DUM-12', 'Write release notes', used_at=3)
+    index.add('OPS-7', 'Database backups', used_at=2)
+    index.add('OPS-8')
+    return index
+
+
+def test_key_prefix():
+    index = make_index()
+    assert [key for key, _ in index.search('dum-1')] == ['DUM-12', 'DUM-1']
+    assert [key for key, _ in index.search('OPS')] == ['OPS-7', 'OPS-8']
+    assert [key for key, _ in index.search('12')] == ['DUM-12']
+
+
+def test_summary_trigrams():
+    index = make_index()
+    assert [key for key, _ in index.search('datab')] == ['OPS-7', 'DUM-1']
+    assert [key for key, _ in index.search('lease')] == ['DUM-12']
+    assert index.search('xyz') == []
+
+
+def test_recently_used_first():
+    index = make_index()
+    index.touch('DUM-1')
+    assert index.search('')[0] == ('DUM-1', 'Investigate database problem')
+
+
+def test_summary_update_reindexes():
+    index = make_index()
+    index.add('OPS-8', 'Rotate certificates')
+    index.add('DUM-1', 'Renamed')
+    assert [key for key, _ in index.search('certif')] == ['OPS-8']
+    assert [key for key, _ in index.search('investigate')] == []
@@ -0,0 +1,42 @@
+from tempo.api import models
+from tempo.api.issues import IssueResolver
+
+
+class FakeJira:
+    def __init__(self, known):
+        self.known = known
+        self.queries = []
+
+    def search(self, jql, fields=None, max_results=50):
+        self.queries.append(jql)
+        return models.IssueSearchResults({'issues': [
+            {
+                'id': str(i),
+                'key': key,
+                'fields': {'summary': f'Summary of {key}'},
+            }
+            for i, key in enumerate(self.known)
+            if f'"{key}"' in jql
+        ]})
+
+
+def test_keys_are_resolved_in_chunks():
+    keys = [f'DUM-{i}' for i in range(60)]
+    jira = FakeJira(keys[:-1])
+    resolver = IssueResolver(jira, chunk_size=25)
+    issues = resolver.resolve(keys + keys[:10])
+    assert len(jira.queries) == 3
+    assert jira.queries[0].startswith('key in ("DUM-0", "DUM-1"')
+    assert issues['DUM-3'].summary == 'Summary of DUM-3'
+    assert issues['DUM-3'].status is None
+    assert issues['DUM-59'] is None
+
+
+def test_results_are_cached():
+    jira = FakeJira(['DUM-1', 'DUM-2'])
+    resolver = IssueResolver(jira)
+    resolver.resolve(['DUM-1'])
+    resolver.resolve(['DUM-1', 'DUM-2'])
+    assert jira.queries == ['key in ("DUM-1")', 'key in ("DUM-2")']
+    assert resolver.get('DUM-2').key == 'DUM-2'
+    assert resolver.missing(['DUM-1', 'DUM-3']) == ['DUM-3']
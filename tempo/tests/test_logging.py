@@ -0,0 +1,56 @@
+import glob
+import logging
+
+from tempo import logging_utils
+from tempo.logging_utils import SharedRotatingFileHandler
+
+
+def read_lines(path):
+    lines = []
+    for name in glob.glob(f'{path}*'):
+        if not name.endswith('.lock'):
+            with open(name) as f:
+                lines.extend(f.read().splitlines())
+    return lines
+
+
+def record(message):
+    return logging.LogRecord('tempo', logging.INFO, '', 0, message, (), None)
+
+
+def test_handlers_share_rotation(tmpdir):
+    path = str(tmpdir.join('tempo.log'))
+    handlers = [
+        SharedRotatingFileHandler(path, maxBytes=200, backupCount=50)
+        for _ in range(2)
+    ]
+    for i in range(40):
+        handlers[i % 2].emit(record(f'message {i:02d}'))
+    for handler in handlers:
+        handler.close()
+    assert sorted(read_lines(path)) == [f'message {i:02d}' for i in range(40)]
+    assert len(glob.glob(f'{path}.*')) > 2
+
+
+def test_records_are_written_in_the_background(tmpdir):
+    path = str(tmpdir.join('logs', 'tempo.log'))
+    logging_utils.configure_logging(path)
+    try:
+        logging.getLogger('tempo_cli.test').info('Selected worklog %s', 126)
+    finally:
+        logging_utils.stop_logging()
+    assert read_lines(path)[-1].endswith(
+        'tempo_cli.test - INFO - Selected worklog 126'
+    )
+
+
+def test_arguments_are_formatted_when_logged(tmpdir):
+    path = str(tmpdir.join('tempo.log'))
+    logging_utils.configure_logging(path)
+    params = {'offset': 0}
+    try:
+        logging.getLogger('tempo.test').info('Params %s', params)
+        params['offset'] = 200
+    finally:
+        logging_utils.stop_logging()
+    assert read_lines(path)[-1].endswith("Params {'offset': 0}")
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from tempo.api import Tempo
+from tempo.api.decorators import api_request, result_cache
+from tempo.api.metrics import metrics, endpoint
+from tempo.api.session import create_session
+from tempo.tests.test_session import serve
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_endpoint_templates():
+    assert endpoint('tempo', 'get', '/core/3/worklogs/123') == (
+        'tempo GET /core/3/worklogs/*'
+    )
+    assert endpoint('jira', 'get', '/rest/api/3/issue/DUM-12') == (
+        'jira GET /rest/api/3/issue/*'
+    )
+    assert endpoint(
+        'tempo', 'get', '/core/3/worklogs/account/557058:f58131cb-b67d'
+    ) == 'tempo GET /core/3/worklogs/account/*'
+
+
+def test_requests_are_recorded(tmpdir):
+    server, url = serve([
+        (503, {}),
+        (200, {}),
+        (404, {}),
+    ])
+    try:
+        tempo = Tempo('token', session=create_session(backoff_factor=0))
+        tempo.base_url = url
+        tempo.get('/core/3/worklogs/126')
+        with pytest.raises(Tempo.ApiError):
+            tempo.get('/core/3/worklogs/127')
+    finally:
+        server.shutdown()
+    stats = metrics.snapshot()['endpoints']['tempo GET /core/3/worklogs/*']
+    assert stats['calls'] == 2
+    assert stats['errors'] == 1
+    assert stats['retries'] == 1
+    assert stats['bytes'] == 2 * len('{"status": 200}')
+    assert stats['latency_ms']['count'] == 2
+    path = str(tmpdir.join('metrics', 'metrics.json'))
+    metrics.dump(path)
+    with open(path) as f:
+        assert json.load(f)['endpoints'].keys() == {
+            'tempo GET /core/3/worklogs/*'
+        }
+
+
+def test_result_cache_hit_rate():
+    calls = []
+
+    class Client:
+        identity = 'metrics'
+
+        @api_request(cache=True, ttl=60)
+        def lookup(self, key):
+            calls.append(key)
+            return key
+
+    result_cache.invalidate()
+    client = Client()
+    for key in ('a', 'a', 'a', 'b'):
+        client.lookup(key)
+    stats = metrics.snapshot()['calls'][Client.lookup.__qualname__]
+    assert (stats['hits'], stats['misses']) == (2, 2)
+    assert stats['hit_rate'] == 0.5
+    assert calls == ['a', 'b']
@@ -0,0 +1,59 @@
+import copy
+
+import pytest
+
+from tempo.api import Tempo
+
+
+def make_pages(worklog_data, total, limit):
+    pages = {}
+    for offset in range(0, total, limit):
+        count = min(limit, total - offset)
+        results = []
+        for i in range(count):
+            worklog = copy.deepcopy(worklog_data)
+            worklog['tempoWorklogId'] = offset + i
+            results.append(worklog)
+        metadata = {'count': count, 'offset': offset, 'limit': limit}
+        if offset + limit < total:
+            metadata['next'] = f'/core/3/worklogs?offset={offset + limit}'
+        pages[offset] = {'metadata': metadata, 'results': results}
+    return pages
+
+
+class PagedTempo(Tempo):
+    def __init__(self, worklog_data, total, limit):
+        super().__init__('token')
+        self.pages = make_pages(worklog_data, total, limit)
+        self.requested = []
+
+    def get(self, path, params={}, **kwargs):
+        self.requested.append(params['offset'])
+        return self.pages.get(
+            params['offset'],
+            {'metadata': {'count': 0}, 'results': []},
+        )
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_iter_worklogs_follows_pages(worklog_data, prefetch):
+    tempo = PagedTempo(worklog_data, total=450, limit=200)
+    ids = [
+        worklog.id
+        for worklog in tempo.iter_worklogs(limit=200, prefetch=prefetch)
+    ]
+    assert ids == list(range(450))
+    assert tempo.requested == [0, 200, 400]
+
+
+def test_iter_worklogs_is_lazy(worklog_data):
+    tempo = PagedTempo(worklog_data, total=450, limit=200)
+    worklogs = tempo.iter_worklogs(limit=200)
+    next(worklogs)
+    assert tempo.requested == [0]
+    worklogs.close()
+
+
+def test_all_worklogs(worklog_data):
+    tempo = PagedTempo(worklog_data, total=5, limit=2)
+    assert [w.id for w in tempo.all_worklogs(limit=2)] == list(range(5))
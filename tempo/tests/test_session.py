@@ -0,0 +1,84 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tempo.api import Tempo, Jira
+from tempo.api.session import create_session
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    replies = []
+    connections = set()
+
+    def do_GET(self):
+        FlakyHandler.connections.add(self.client_address)
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        status, headers = FlakyHandler.replies.pop(0)
+        body = json.dumps({'status': status}).encode()
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(responses):
+    FlakyHandler.protocol_version = 'HTTP/1.1'
+    FlakyHandler.replies = list(responses)
+    FlakyHandler.connections = set()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def test_retries_429_with_retry_after():
+    server, url = serve([
+        (429, {'Retry-After': '0'}),
+        (503, {}),
+        (200, {}),
+    ])
+    try:
+        tempo = Tempo('token', session=create_session(backoff_factor=0))
+        tempo.base_url = url
+        assert tempo.get('/core/3/worklogs') == {'status': 200}
+    finally:
+        server.shutdown()
+
+
+def test_post_is_retried_on_429():
+    server, url = serve([
+        (429, {'Retry-After': '0'}),
+        (200, {}),
+    ])
+    try:
+        tempo = Tempo('token', session=create_session(backoff_factor=0))
+        tempo.base_url = url
+        assert tempo.post('/core/3/worklogs', json={}) == {'status': 200}
+    finally:
+        server.shutdown()
+
+
+def test_connections_are_reused():
+    server, url = serve([(200, {})] * 5)
+    try:
+        tempo = Tempo('token')
+        tempo.base_url = url
+        for _ in range(5):
+            tempo.get('/core/3/worklogs')
+        assert len(FlakyHandler.connections) == 1
+    finally:
+        server.shutdown()
+
+
+def test_jira_shares_tempo_session():
+    tempo = Tempo('token')
+    jira = Jira('jira-token', expires=None, tempo=tempo, session=tempo.session)
+    assert jira.session is tempo.session
+    assert jira.headers != tempo.headers
@@ -0,0 +1,67 @@
+import copy
+import struct
+
+import pytest
+
+from tempo.api import snapshot
+from tempo.api.models import Worklog, Worklogs, UserSchedules
+from tempo.api.snapshot import SnapshotError
+
+
+@pytest.fixture
+def worklogs(worklog_data):
+    other = copy.deepcopy(worklog_data)
+    other['tempoWorklogId'] = 127
+    other['attributes'] = {'values': [{'key': '_Account_', 'value': 'X'}]}
+    del other['billableSeconds']
+    return Worklogs({
+        'self': 'https://api.tempo.io/core/3/worklogs',
+        'metadata': {'count': 3, 'offset': 0, 'limit': 50},
+        'results': [worklog_data, other, copy.deepcopy(worklog_data)],
+    })
+
+
+def test_round_trip(worklogs, tmp_path):
+    path = str(tmp_path / 'worklogs.snapshot')
+    snapshot.save(worklogs, path)
+    loaded = snapshot.load(path)
+    assert isinstance(loaded, Worklogs)
+    assert loaded.raw_data == worklogs.raw_data
+    assert loaded.metadata.limit == 50
+    assert [w.id for w in loaded] == [126, 127, 126]
+    assert loaded[0].started == worklogs[0].started
+
+
+def test_round_trip_schedules():
+    schedules = UserSchedules({'results': [
+        {'date': '2019-01-01', 'requiredSeconds': 0, 'type': 'HOLIDAY'},
+    ]})
+    loaded = snapshot.loads(snapshot.dumps(schedules))
+    assert loaded.raw_data == schedules.raw_data
+    assert snapshot.loads(snapshot.dumps(Worklogs([]))).raw_data == {
+        'results': [],
+    }
+
+
+def test_round_trip_nested_empty_records():
+    schedules = UserSchedules({'results': [{'a': {}}, {'a': {'b': {}}}, {}]})
+    loaded = snapshot.loads(snapshot.dumps(schedules))
+    assert loaded.raw_data == schedules.raw_data
+
+
+def test_schema_change_is_rejected(worklogs, monkeypatch):
+    data = snapshot.dumps(worklogs)
+    monkeypatch.setattr(Worklog, 'fields', Worklog.fields[:-1])
+    with pytest.raises(SnapshotError):
+        snapshot.loads(data)
+
+
+def test_invalid_snapshots_are_rejected(worklogs):
+    data = snapshot.dumps(worklogs)
+    with pytest.raises(SnapshotError):
+        snapshot.loads(b'not a snapshot' + data)
+    with pytest.raises(SnapshotError):
+        snapshot.loads(data[:-10])
+    newer = struct.pack('>8sH', snapshot.MAGIC, snapshot.VERSION + 1)
+    with pytest.raises(SnapshotError):
+        snapshot.loads(newer + data[10:])
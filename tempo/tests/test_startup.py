@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+
+from tempo_cli import __version__
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+HEAVY_MODULES = (
+    'requests', 'urllib3', 'curses', 'oauth2_client', 'numpy', 'aiohttp',
+    'tempo.api.api',
+)
+
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, PYTHONPATH=ROOT),
+    )
+
+
+def test_cli_import_is_lazy():
+    result = run_python(
+        'import sys\n'
+        'import tempo_cli.main\n'
+        'from tempo.config import config\n'
+        f'print(*[name for name in {HEAVY_MODULES!r} '
+        'if name in sys.modules])\n'
+        'print(config.loaded)\n'
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines() == ['', 'False']
+
+
+def test_version_skips_config_and_auth():
+    result = run_python(
+        'from tempo.config import config\n'
+        'from tempo_cli.main import main\n'
+        'try:\n'
+        '    main(["--version"])\n'
+        'except SystemExit:\n'
+        '    print(config.loaded)\n'
+    )
+    assert result.stdout.split() == ['tempo-cli', __version__, 'False']
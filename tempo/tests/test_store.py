@@ -0,0 +1,115 @@
+import copy
+import datetime
+
+import pytest
+
+from tempo.api import models
+from tempo.store import WorklogStore
+
+
+def make_worklog(worklog_data, worklog_id, start_date, updated_at=None):
+    data = copy.deepcopy(worklog_data)
+    data['tempoWorklogId'] = worklog_id
+    data['startDate'] = start_date
+    if updated_at:
+        data['updatedAt'] = updated_at
+    return models.Worklog(data)
+
+
+class FakeTempo:
+    def __init__(self, worklogs):
+        self.remote = {worklog.id: worklog for worklog in worklogs}
+        self.calls = []
+
+    def iter_worklogs(self, account_id=None, from_date=None, to_date=None,
+                      updated_from=None):
+        self.calls.append((from_date, to_date, updated_from))
+        for worklog in self.remote.values():
+            if updated_from:
+                if worklog.updated_at.date() >= updated_from:
+                    yield worklog
+            elif from_date <= worklog.started.date() <= to_date:
+                yield worklog
+
+
+@pytest.fixture
+def store():
+    store = WorklogStore(':memory:')
+    yield store
+    store.close()
+
+
+WEEK = (datetime.date(2017, 2, 6), datetime.date(2017, 2, 12))
+
+
+def test_initial_sync_downloads_range(store, worklog_data):
+    tempo = FakeTempo([
+        make_worklog(worklog_data, 1, '2017-02-06'),
+        make_worklog(worklog_data, 2, '2017-02-08'),
+        make_worklog(worklog_data, 3, '2017-03-01'),
+    ])
+    assert store.sync(tempo, *WEEK) == 2
+    assert [worklog.id for worklog in store.worklogs(*WEEK)] == [1, 2]
+    assert store.worklogs(*WEEK)[0].issue.key == 'DUM-1'
+
+
+def test_later_syncs_only_pull_updates(store, worklog_data):
+    tempo = FakeTempo([make_worklog(worklog_data, 1, '2017-02-06')])
+    store.sync(tempo, *WEEK)
+    today = datetime.date.today()
+    tempo.remote[2] = make_worklog(
+        worklog_data, 2, '2017-02-07', today.strftime('%Y-%m-%dT00:00:00Z')
+    )
+    tempo.calls = []
+    assert store.sync(tempo, *WEEK) == 1
+    assert tempo.calls == [(None, None, today)]
+    assert [worklog.id for worklog in store.worklogs(*WEEK)] == [1, 2]
+
+
+def test_reconcile_handles_deletions(store, worklog_data):
+    tempo = FakeTempo([
+        make_worklog(worklog_data, 1, '2017-02-06'),
+        make_worklog(worklog_data, 2, '2017-02-07'),
+    ])
+    store.sync(tempo, *WEEK)
+    del tempo.remote[2]
+    store.reconcile(tempo, *WEEK)
+    assert [worklog.id for worklog in store.worklogs(*WEEK)] == [1]
+
+
+def test_resync_reconciles_deletions(store, worklog_data):
+    tempo = FakeTempo([
+        make_worklog(worklog_data, 1, '2017-02-06'),
+        make_worklog(worklog_data, 2, '2017-02-07'),
+    ])
+    store.sync(tempo, *WEEK)
+    del tempo.remote[2]
+    store.sync(tempo, *WEEK)
+    assert [worklog.id for worklog in store.worklogs(*WEEK)] == [1, 2]
+    store.reconcile_ttl = 0
+    store.sync(tempo, *WEEK)
+    assert [worklog.id for worklog in store.worklogs(*WEEK)] == [1]
+
+
+def test_new_store_reconciles_synced_range(tmpdir, worklog_data):
+    path = str(tmpdir.join('worklogs.sqlite'))
+    tempo = FakeTempo([
+        make_worklog(worklog_data, 1, '2017-02-06'),
+        make_worklog(worklog_data, 2, '2017-02-07'),
+    ])
+    WorklogStore(path).sync(tempo, *WEEK)
+    del tempo.remote[2]
+    store = WorklogStore(path)
+    store.sync(tempo, *WEEK)
+    assert [worklog.id for worklog in store.worklogs(*WEEK)] == [1]
+
+
+def test_store_file_follows_the_account(tmpdir):
+    directory = str(tmpdir)
+    site = 'https://example.atlassian.net'
+    first = WorklogStore.for_account(site, 'account-1', directory)
+    again = WorklogStore.for_account(site, 'account-1', directory)
+    other = WorklogStore.for_account(site, 'account-2', directory)
+    assert first.path == again.path != other.path
+    for store in (first, again, other):
+        store.close()
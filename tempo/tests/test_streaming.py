@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from tempo.api.streaming import JSONStream
+from tempo.tests.test_pagination import PagedTempo
+
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize('size', [1, 3, 7, 4096])
+def test_stream_matches_json_loads(size):
+    document = {
+        'self': 'https://api.tempo.io/core/3/worklogs',
+        'metadata': {'count': 4, 'offset': 0, 'limit': 4},
+        'results': [
+            {'description': 'quotes " and brackets ] } [ {'},
+            {'description': 'ünïcödé ☃', 'nested': [1, [2, {}]]},
+            12345678,
+            -1.5e3,
+        ],
+        'trailing': [True, False, None],
+    }
+    stream = JSONStream(chunked(json.dumps(document).encode(), size))
+    assert list(stream) == document['results']
+    assert stream.members == {
+        key: value for key, value in document.items() if key != 'results'
+    }
+
+
+def test_members_before_array_are_read_first():
+    stream = JSONStream(
+        chunked(b'{"metadata": {"count": 1}, "results": [{"a": 1}]}', 5)
+    )
+    stream.read_members()
+    assert stream.members == {'metadata': {'count': 1}}
+    assert list(stream) == [{'a': 1}]
+
+
+def test_bare_and_empty_arrays():
+    assert list(JSONStream([b'[1, 2, 3]'])) == [1, 2, 3]
+    assert list(JSONStream([b'{"results": []}'])) == []
+    assert list(JSONStream([b'{}'])) == []
+
+
+def test_truncated_stream_raises():
+    with pytest.raises(ValueError):
+        list(JSONStream([b'{"results": [{"a": 1}, {"b"']))
+
+
+class StreamedResponse:
+    def __init__(self, data, size):
+        self.data = json.dumps(data).encode()
+        self.size = size
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        return iter(chunked(self.data, self.size))
+
+    def close(self):
+        self.closed = True
+
+
+class StreamedTempo(PagedTempo):
+    def get(self, path, params={}, stream=False, **kwargs):
+        page = super().get(path, params, **kwargs)
+        assert stream
+        self.responses.append(StreamedResponse(page, size=50))
+        return self.responses[-1]
+
+
+def test_iter_worklogs_streams_pages(worklog_data):
+    tempo = StreamedTempo(worklog_data, total=5, limit=2)
+    tempo.responses = []
+    ids = [worklog.id for worklog in tempo.iter_worklogs(limit=2, stream=True)]
+    assert ids == list(range(5))
+    assert tempo.requested == [0, 2, 4]
+    assert all(response.closed for response in tempo.responses)
+
+
+def test_stream_worklogs_metadata(worklog_data):
+    tempo = StreamedTempo(worklog_data, total=5, limit=2)
+    tempo.responses = []
+    page = tempo.stream_worklogs(limit=2)
+    assert page.metadata.count == 2
+    assert page.metadata.next
+    assert [worklog.issue.key for worklog in page] == ['DUM-1', 'DUM-1']
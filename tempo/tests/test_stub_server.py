@@ -0,0 +1,109 @@
+import datetime
+
+import pytest
+
+from tempo.api import Tempo, Jira
+from tempo.api.session import create_session
+from tempo.stub_server import (
+    Dataset, Faults, Recorder, Replay, Stub, StubServer, pseudonym,
+)
+
+
+def connect(server, **session_kwargs):
+    tempo = Tempo(
+        'token', session=create_session(backoff_factor=0, **session_kwargs)
+    )
+    tempo.base_url = server.url
+    jira = Jira.auth_by_tempo(tempo)
+    jira.base_url = server.url
+    return tempo, jira
+
+
+def test_worklogs_are_paginated():
+    stub = Stub(Dataset(worklogs=250), max_limit=100)
+    with StubServer(stub) as server:
+        tempo, _ = connect(server)
+        page = tempo.worklogs(limit=1000)
+        assert page.metadata.limit == 100
+        assert page.metadata.next
+        worklogs = list(tempo.iter_worklogs(limit=1000))
+    assert [worklog.id for worklog in worklogs] == list(range(250))
+
+
+def test_worklogs_updated_from():
+    with StubServer(Stub(Dataset(worklogs=40))) as server:
+        tempo, _ = connect(server)
+        worklogs = tempo.worklogs(
+            updated_from=datetime.date(2019, 1, 3), limit=100
+        )
+    assert [worklog.id for worklog in worklogs] == list(range(16, 40))
+
+
+def test_faults_are_retried():
+    faults = Faults(error_rate=0.3, rate_limit_rate=0.3, seed=1)
+    with StubServer(Stub(Dataset(worklogs=40), faults=faults)) as server:
+        tempo, _ = connect(server, max_retries=10)
+        for _ in range(5):
+            assert len(list(tempo.worklogs(limit=40))) == 40
+
+
+def test_created_worklogs_are_served():
+    with StubServer(Stub(Dataset(worklogs=0))) as server:
+        tempo, jira = connect(server)
+        created = tempo.create_worklog(
+            issue_key='DUM-3',
+            time_spent=3600,
+            started=datetime.datetime(2020, 1, 6, 9),
+            author_account_id=jira.myself().account_id,
+        )
+        assert created.author.account_id == 'account-0'
+        worklogs = tempo.worklogs(
+            from_date=datetime.date(2020, 1, 6),
+            to_date=datetime.date(2020, 1, 6),
+        )
+        assert [worklog.id for worklog in worklogs] == [created.id]
+        assert jira.issue('DUM-3').key == 'DUM-3'
+        issues = jira.issue_resolver.resolve(['DUM-3', 'NOPE-1'])
+        assert issues['DUM-3'].summary == 'Dummy issue 3'
+        assert issues['NOPE-1'] is None
+
+
+def test_replayed_responses_are_served_in_turn():
+    replay = Replay([
+        {'method': 'get', 'path': '/rest/api/3/myself', 'status': 503},
+        {
+            'method': 'get',
+            'path': '/rest/api/3/myself',
+            'body': {'accountId': 'recorded', 'displayName': 'Recorded'},
+        },
+    ])
+    with StubServer(Stub(replay=replay)) as server:
+        _, jira = connect(server, max_retries=0)
+        with pytest.raises(Jira.ApiError):
+            jira.myself(cache=False)
+        assert jira.myself(cache=False).account_id == 'recorded'
+
+
+def test_recordings_leave_out_credentials(tmpdir):
+    path = str(tmpdir.join('recorded.json'))
+    with StubServer() as upstream:
+        recorder = Recorder(path, upstream.url, upstream.url, upstream.url)
+        with StubServer(Stub(recorder=recorder)) as server:
+            tempo, jira = connect(server)
+            account_id = jira.myself(cache=False).account_id
+            tempo.worklogs(account_id=account_id, limit=5)
+    with open(path) as f:
+        recorded = f.read()
+    for secret in ('stub-jira-token', 'stub@example.com', 'Stub User',
+                   '"account-0"', '/account-0'):
+        assert secret not in recorded
+    with StubServer(Stub(replay=Replay.load(path))) as server:
+        _, jira = connect(server)
+        assert jira.myself(cache=False).account_id == pseudonym('account-0')
+
+
+def test_recorder_upstreams():
+    recorder = Recorder('unused', 'https://api', 'https://jira', 'https://app')
+    assert recorder.upstream('/core/3/worklogs') == 'https://api'
+    assert recorder.upstream('/rest/api/3/myself') == 'https://jira'
+    assert recorder.upstream('/rest/jira/client/search/') == 'https://app'
@@ -0,0 +1,65 @@
+import datetime
+
+import pytest
+
+from tempo.api import timestamps
+from tempo.api.models import (
+    DATE_FORMAT, TIME_FORMAT, DATETIME_FORMAT, Worklog
+)
+
+
+def strptime(value, frmt):
+    try:
+        return datetime.datetime.strptime(value, frmt)
+    except ValueError:
+        return ValueError
+
+
+def parse(f, value):
+    try:
+        return f(value)
+    except ValueError:
+        return ValueError
+
+
+DATES = [
+    '2017-02-06', '2020-02-29', '2019-02-29', '2019-13-01', '2019-00-10',
+    '2019-2-6', '2019-02-06 ', '19-02-06', '2019/02/06', '', 'x' * 10,
+    '٢٠١٩-٠٢-٠٦',
+]
+TIMES = [
+    '20:06:00', '00:00:00', '23:59:59', '24:00:00', '12:60:00', '9:05:00',
+    '20:06', '20:06:00.5', '',
+]
+
+
+@pytest.mark.parametrize('value', DATES)
+def test_parse_date_matches_strptime(value):
+    expected = strptime(value, DATE_FORMAT)
+    if expected is not ValueError:
+        expected = expected.date()
+    assert parse(timestamps.parse_date, value) == expected
+
+
+@pytest.mark.parametrize('value', TIMES)
+def test_parse_time_matches_strptime(value):
+    expected = strptime(value, TIME_FORMAT)
+    if expected is not ValueError:
+        expected = expected.time()
+    assert parse(timestamps.parse_time, value) == expected
+
+
+@pytest.mark.parametrize('date', DATES[:5])
+@pytest.mark.parametrize('time', TIMES)
+def test_parse_datetime_and_combine_match_strptime(date, time):
+    value = f'{date}T{time}Z'
+    expected = strptime(value, DATETIME_FORMAT)
+    assert parse(timestamps.parse_datetime, value) == expected
+    assert parse(lambda _: timestamps.combine(date, time), None) == expected
+
+
+def test_started_is_combined_without_formatting(worklog_data):
+    worklog_data['startTime'] = '07:08:09'
+    assert Worklog(worklog_data).started == datetime.datetime(
+        2017, 2, 6, 7, 8, 9
+    )
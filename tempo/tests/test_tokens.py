@@ -0,0 +1,119 @@
+import time
+
+import pytest
+
+from tempo.api import Tempo, Jira
+from tempo.api.api import Api
+from tempo.api.tokens import JiraTokenManager, parse_expires
+
+
+class FakeTempo(Tempo):
+    def __init__(self, lifetime=3600):
+        super().__init__('tempo-token')
+        self.lifetime = lifetime
+        self.issued = 0
+
+    def get(self, path, **kwargs):
+        assert path == '/jira/v1/get-jira-oauth-token/'
+        self.issued += 1
+        return {
+            'token': f'jira-{self.issued}',
+            'expiresAt': int((time.time() + self.lifetime) * 1000),
+        }
+
+
+@pytest.mark.parametrize('value, expected', [
+    (1700000000, 1700000000),
+    (1700000000000, 1700000000),
+    ('1700000000000', 1700000000),
+    ('2023-11-14T22:13:20Z', 1700000000),
+    ('2023-11-14T22:13:20.000+00:00', 1700000000),
+    (None, None),
+])
+def test_parse_expires(value, expected):
+    assert parse_expires(value) == expected
+
+
+def test_token_is_cached():
+    tempo = FakeTempo()
+    jira = Jira.auth_by_tempo(tempo)
+    assert tempo.issued == 0
+    assert jira.token_manager.get() == 'jira-1'
+    Jira.auth_by_tempo(tempo).token_manager.get()
+    assert tempo.issued == 1
+    tempo.jira_tokens.close()
+
+
+def test_token_is_persisted():
+    tempo = FakeTempo()
+    tempo.jira_tokens.get()
+    tempo.jira_tokens.close()
+    manager = JiraTokenManager(tempo)
+    assert manager.get() == 'jira-1'
+    assert tempo.issued == 1
+    manager.close()
+
+
+def test_manager_without_identity():
+    tempo = FakeTempo()
+    tempo.identity = None
+    manager = JiraTokenManager(tempo)
+    assert manager.path.endswith('jira-token-anonymous.json')
+    assert manager.get() == 'jira-1'
+    manager.close()
+
+
+def test_expired_token_is_refetched():
+    tempo = FakeTempo(lifetime=0)
+    tempo.jira_tokens.get()
+    tempo.jira_tokens.get()
+    assert tempo.issued == 2
+
+
+def test_refresh_before_expiry():
+    tempo = FakeTempo(lifetime=60.2)
+    tempo.jira_tokens.refresh_margin = 60
+    tempo.jira_tokens.get()
+    time.sleep(0.5)
+    assert tempo.issued >= 2
+    tempo.jira_tokens.close()
+
+
+def test_retry_once_on_401(monkeypatch):
+    tempo = FakeTempo()
+    jira = Jira.auth_by_tempo(tempo)
+    seen = []
+
+    def request(self, *args, **kwargs):
+        seen.append(self.headers['Authorization'])
+        if len(seen) == 1:
+            error = type('Error', (Exception, ), {})()
+            error.response = type('Response', (), {'status_code': 401})()
+            raise self.ApiError(error, 'Unauthorized')
+        return {'accountId': 'me', 'displayName': 'Me'}
+
+    monkeypatch.setattr(Api, 'request', request)
+    assert jira.get('/rest/api/3/myself')['accountId'] == 'me'
+    assert seen == ['Bearer jira-1', 'Bearer jira-2']
+    tempo.jira_tokens.close()
+
+
+def test_tempo_reauthenticates_once_on_401(monkeypatch):
+    tokens = iter(['fresh-token'])
+    tempo = Tempo('stale-token', reauthenticate=lambda: next(tokens))
+    seen = []
+
+    def request(self, *args, **kwargs):
+        seen.append(self.headers['Authorization'])
+        if self.headers['Authorization'] == 'Bearer stale-token':
+            error = type('Error', (Exception, ), {})()
+            error.response = type('Response', (), {'status_code': 401})()
+            raise self.ApiError(error, 'Unauthorized')
+        return {}
+
+    monkeypatch.setattr(Api, 'request', request)
+    assert tempo.get('/core/3/worklogs') == {}
+    assert tempo.get('/core/3/worklogs') == {}
+    assert seen == [
+        'Bearer stale-token', 'Bearer fresh-token', 'Bearer fresh-token',
+    ]
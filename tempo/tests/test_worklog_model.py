@@ -1,5 +1,7 @@
 import datetime
 
+import pytest
+
 from tempo.api.models import Worklog
 
 
@@ -59,3 +61,32 @@ def test_from_dict():
     assert w.updated_at == datetime.datetime(2017, 2, 6, 16, 41, 42)
     assert w.time_spent.total_seconds() == data['timeSpentSeconds']
     assert w.started == datetime.datetime(2017, 2, 6, 20, 6)
+
+
+def test_fields_are_slotted_and_lazy(worklog_data):
+    worklog_data['createdAt'] = 'not a date'
+    w = Worklog(worklog_data)
+    assert not hasattr(w, '__dict__')
+    assert w.issue.key == 'DUM-1'
+    assert w.issue is w.issue
+    with pytest.raises(ValueError):
+        w.created_at
+
+
+def test_load_converts_every_field(worklog_data):
+    w = Worklog(worklog_data).load()
+    worklog_data.clear()
+    assert w.started == datetime.datetime(2017, 2, 6, 20, 6)
+    assert w.author.display_name == 'John Brown'
+
+
+def test_compiled_parsers_match_fields(worklog_data):
+    eager, = Worklog.from_list([worklog_data], eager=True)
+    for field in Worklog.fields:
+        expected = field.value(worklog_data)
+        actual = getattr(eager, field.name)
+        if hasattr(expected, 'raw_data'):
+            expected, actual = expected.raw_data, actual.raw_data
+        assert actual == expected
+    assert eager.raw_data is worklog_data
+    assert eager.self_link == worklog_data['self']
@@ -2,15 +2,15 @@ import logging
 import uuid
 import sys
 import datetime
+import hashlib
+import json
+import os
+import time
 from functools import wraps
 from urllib.parse import urljoin
-import webbrowser
 
-from oauth2_client.credentials_manager import (
-    CredentialManager, ServiceInformation, OAuthError
-)
+from appdirs import user_cache_dir
 
-from tempo.api import Tempo
 from tempo.config import config
 
 
@@ -28,16 +28,75 @@ BAD_ACCESS_TOKEN = (
     'to authenticate again? (Yy/Nn): '
 )
 
+VALIDATIONS_FILE = os.path.join(
+    user_cache_dir(appname='tempo'), 'token-validations.json'
+)
+
+
+class AuthenticationError(Exception):
+    pass
 
-def ensure_auth(f):
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        authenticate()
-        return f(*args, **kwargs, config=config)
-    return wrapper
+
+def ensure_auth(original_function=None, optimistic=False):
+    '''
+        Authenticate before running a command. With optimistic a stored
+        access token is used without checking it first, unless it is
+        known to be bad. The command then relies on reauthentication
+        when a request is rejected.
+    '''
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            authenticate(optimistic=optimistic)
+            return f(*args, **kwargs, config=config)
+        return wrapper
+    if original_function:
+        return decorator(original_function)
+    return decorator
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def load_validations() -> dict:
+    try:
+        with open(VALIDATIONS_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_validation(token: str, valid: bool):
+    validations = load_validations()
+    validations[token_key(token)] = {'valid': valid, 'checked_at': time.time()}
+    os.makedirs(os.path.dirname(VALIDATIONS_FILE), exist_ok=True)
+    fd = os.open(
+        VALIDATIONS_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+    )
+    with os.fdopen(fd, 'w') as f:
+        json.dump(validations, f)
+
+
+def cached_validation(token: str):
+    '''
+        Whether the token was found valid within the validation TTL,
+        or None when that is not known.
+    '''
+    validation = load_validations().get(token_key(token))
+    if validation is None:
+        return None
+    age = time.time() - validation['checked_at']
+    if age > float(config.tempo.token_validation_ttl):
+        return None
+    return validation['valid']
 
 
 def validate_access_token(access_token):
+    cached = cached_validation(access_token)
+    if cached is not None:
+        return cached
+    from tempo.api import Tempo
     tempo = Tempo(access_token)
     try:
         tempo.worklogs(
@@ -45,18 +104,84 @@ def validate_access_token(access_token):
             to_date=datetime.datetime.now(),
             limit=1
         )
-    except Tempo.ApiError:
+    except Tempo.ApiError as e:
+        # Only a rejected token is known to be bad, other errors say
+        # nothing about it and are not remembered.
+        if e.status_code == 401:
+            save_validation(access_token, False)
+        else:
+            logger.warning('Could not validate the access token: %s', e)
         return False
+    save_validation(access_token, True)
     return True
 
 
-def authenticate():
+def service_information():
+    from oauth2_client.credentials_manager import ServiceInformation
+    return ServiceInformation(
+        urljoin(
+            config.jira.url,
+            '/plugins/servlet/ac/io.tempo.jira/oauth-authorize/'
+        ),
+        urljoin(
+            config.tempo.api_url,
+            '/oauth/token/',
+        ),
+        config.tempo.client_id,
+        config.tempo.client_secret,
+        [],
+    )
+
+
+def refresh_access_token() -> str:
+    '''
+        Get a new access token after Tempo rejected the current one.
+        Runs while the UI owns the terminal, so it only uses the refresh
+        token and never prompts.
+    '''
+    from oauth2_client.credentials_manager import (
+        CredentialManager, OAuthError
+    )
+    save_validation(config.tempo.access_token, False)
+    if not (
+        config.tempo.client_id
+        and config.tempo.client_secret
+        and config.tempo.refresh_token
+    ):
+        raise AuthenticationError(
+            'Tempo rejected the access token, '
+            'restart tempo-cli to authenticate again'
+        )
+    manager = CredentialManager(service_information())
+    try:
+        manager.init_with_token(config.tempo.refresh_token)
+    except OAuthError as e:
+        raise AuthenticationError(f'Could not refresh the access token: {e}')
+    with config.transaction():
+        config.tempo.access_token = manager._access_token
+        if manager.refresh_token:
+            config.tempo.refresh_token = manager.refresh_token
+    save_validation(manager._access_token, True)
+    return manager._access_token
+
+
+def authenticate(optimistic=False):
+    import webbrowser
+    from oauth2_client.credentials_manager import (
+        CredentialManager, OAuthError
+    )
+    from tempo.api import Tempo
+
     while not config.jira.url:
         part = input(NEED_JIRA_URL)
         path = Tempo.matching_instances(part)
         if path:
             config.jira.url = path
     if config.tempo.access_token:
+        if optimistic and (
+            cached_validation(config.tempo.access_token) is not False
+        ):
+            return
         if validate_access_token(config.tempo.access_token):
             return
         logger.info(
@@ -64,21 +189,8 @@ def authenticate():
         )
         # config.tempo.access_token = None
     if config.tempo.client_id and config.tempo.client_secret:
-        service_information = ServiceInformation(
-            urljoin(
-                config.jira.url,
-                '/plugins/servlet/ac/io.tempo.jira/oauth-authorize/'
-            ),
-            urljoin(
-                config.tempo.api_url,
-                '/oauth/token/',
-            ),
-            config.tempo.client_id,
-            config.tempo.client_secret,
-            [],
-        )
         manager = CredentialManager(
-            service_information,
+            service_information(),
         )
         if config.tempo.refresh_token:
             try:
@@ -107,8 +219,11 @@ def authenticate():
         logger.debug('Code got = %s', code)
         manager.init_with_authorize_code(redirect_uri, code)
         logger.debug('Access got = %s', manager._access_token)
-        config.tempo.access_token = manager._access_token
-        config.tempo.refresh_token = manager.refresh_token
+        with config.transaction():
+            config.tempo.access_token = manager._access_token
+            config.tempo.refresh_token = manager.refresh_token
+            # The new tokens may belong to someone else.
+            config.jira.account_id = None
     else:
         webbrowser.open(
             urljoin(
@@ -121,7 +236,9 @@ def authenticate():
             'Paste your access token here:'
         )
         if validate_access_token(access_token):
-            config.tempo.access_token = access_token
+            with config.transaction():
+                config.tempo.access_token = access_token
+                config.jira.account_id = None
         else:
             print('Could not communicate with tempo. Check the logs.')
             sys.exit(1)
@@ -0,0 +1,108 @@
+import csv
+import datetime
+import json
+import logging
+import re
+import sys
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+SECONDS_KEYS = ('time_spent', 'billable', 'remaining_estimate')
+FORMATS = ('csv', 'ndjson')
+
+HOURS = re.compile(r'^\d+(?:[.,]\d+)?$')
+DURATION = re.compile(
+    r'^(?:(\d+(?:[.,]\d+)?)h)?\s*(?:(\d+)m)?\s*(?:(\d+)s)?$'
+)
+
+
+def parse_duration(value) -> int:
+    '''
+        Seconds from a duration. As in the worklog form, a bare number
+        is hours, written 1.5 or 1,5. Units may be given as 1.5h, 30m,
+        1h 30m or, for seconds, 3600s.
+    '''
+    if isinstance(value, (int, float)):
+        return int(value * 3600)
+    value = value.strip().lower()
+    if HOURS.match(value):
+        hours, minutes, seconds = value, None, None
+    else:
+        match = DURATION.match(value)
+        if not (match and any(match.groups())):
+            raise ValueError(f'Invalid duration {value!r}')
+        hours, minutes, seconds = match.groups()
+    total = float((hours or '0').replace(',', '.')) * 3600
+    return int(total + int(minutes or 0) * 60 + int(seconds or 0))
+
+
+def convert_item(row) -> dict:
+    '''
+        Keyword arguments for Tempo.update_worklog from a CSV row or an
+        NDJSON line. Billable defaults to the time spent, as in the
+        worklog form.
+    '''
+    if isinstance(row, str):
+        row = json.loads(row)
+    item = {
+        key: value
+        for key, value in row.items()
+        if value not in (None, '')
+    }
+    for key in SECONDS_KEYS:
+        if key in item:
+            item[key] = parse_duration(item[key])
+    if 'time_spent' in item:
+        item.setdefault('billable', item['time_spent'])
+    if isinstance(item.get('started'), str):
+        item['started'] = datetime.datetime.fromisoformat(item['started'])
+    if isinstance(item.get('worklog_id'), str):
+        item['worklog_id'] = int(item['worklog_id'])
+    return item
+
+
+def read_rows(f, frmt: str) -> Iterator:
+    '''
+        Raw input rows, they are converted per item so that one bad row
+        only fails itself.
+    '''
+    if frmt == 'csv':
+        return csv.DictReader(f)
+    return (line for line in f if line.strip())
+
+
+def guess_format(path: str) -> str:
+    if path.endswith('.csv'):
+        return 'csv'
+    return 'ndjson'
+
+
+def run_bulk(tempo, path, frmt=None, workers=8, journal=None) -> int:
+    from tempo.api.bulk import update_worklogs
+    frmt = frmt or guess_format(path)
+    f = sys.stdin if path == '-' else open(path, newline='')
+    succeeded = failed = 0
+    try:
+        for result in update_worklogs(
+            tempo,
+            read_rows(f, frmt),
+            workers=workers,
+            journal=journal,
+            convert=convert_item,
+        ):
+            if result.ok:
+                succeeded += 1
+            else:
+                failed += 1
+                print(
+                    f'Row {result.index} failed: {result.error}',
+                    file=sys.stderr,
+                )
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    print(f'{succeeded} worklogs written, {failed} failed')
+    if failed and journal:
+        print(f'Rerun with --journal {journal} to retry the failed rows')
+    return 1 if failed else 0
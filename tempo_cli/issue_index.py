@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import defaultdict
+from typing import List, Tuple
+
+
+def trigrams(text: str) -> set:
+    text = f'  {text.lower()} '
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class IssueIndex:
+    '''
+        In-memory typeahead index over issues the user has seen.
+        Keys are matched by prefix, summaries by trigrams, and more
+        recently used issues rank first.
+    '''
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.issues = {}
+        self.trigrams = defaultdict(set)
+
+    def __len__(self):
+        return len(self.issues)
+
+    def add(self, key: str, summary: str = None, used_at: float = None):
+        with self.lock:
+            old_summary, old_used_at = self.issues.get(key, (None, 0))
+            summary = summary or old_summary
+            used_at = max(used_at or 0, old_used_at)
+            if summary and summary != old_summary:
+                if old_summary:
+                    for trigram in trigrams(old_summary):
+                        self.trigrams[trigram].discard(key)
+                for trigram in trigrams(summary):
+                    self.trigrams[trigram].add(key)
+            self.issues[key] = (summary, used_at)
+
+    def touch(self, key: str):
+        self.add(key, used_at=time.time())
+
+    def add_picker_sections(self, sections):
+        for section in sections:
+            for issue in section.issues:
+                self.add(issue.key, issue.summary)
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, str]]:
+        query = query.strip()
+        with self.lock:
+            if not query:
+                matches = set(self.issues)
+                key_matches = set()
+            else:
+                upper = query.upper()
+                key_matches = {
+                    key for key in self.issues
+                    if key.startswith(upper)
+                    or key.rpartition('-')[2].startswith(upper)
+                }
+                matches = set(key_matches)
+                if len(query) >= 3:
+                    lower = query.lower()
+                    candidates = set.intersection(*(
+                        self.trigrams.get(lower[i:i + 3], set())
+                        for i in range(len(lower) - 2)
+                    ))
+                    matches |= {
+                        key for key in candidates
+                        if lower in self.issues[key][0].lower()
+                    }
+            ranked = sorted(
+                matches,
+                key=lambda key: (
+                    key not in key_matches,
+                    -self.issues[key][1],
+                    key,
+                ),
+            )
+            return [(key, self.issues[key][0]) for key in ranked[:limit]]
@@ -1,18 +1,104 @@
+import argparse
 import logging
-from curses import wrapper
+import os
+import sys
 
-from tempo_cli.auth import ensure_auth
-from tempo.api import Tempo, Jira
-from tempo_cli.ui.container import TempoUI
+from tempo_cli import __version__
+from tempo_cli.auth import ensure_auth, refresh_access_token
+from tempo_cli.bulk import run_bulk, FORMATS
 
 logger = logging.getLogger(__name__)
 
+# Commands import the HTTP clients and curses when they run, so that
+# --help, --version and scripted calls start quickly.
 
-@ensure_auth
-def main(config):
+
+def account_id(jira, config) -> str:
+    '''
+        The account id of the authenticated user, remembered in the
+        configuration so that startup does not wait for Jira.
+    '''
+    if not config.jira.account_id:
+        config.jira.account_id = jira.myself(cache=True).account_id
+    return config.jira.account_id
+
+
+@ensure_auth(optimistic=True)
+def ui(args, config):
+    from curses import wrapper
+    from tempo.api import Tempo, Jira
+    from tempo.store import WorklogStore
+    from tempo_cli.ui.container import TempoUI
     try:
-        tempo = Tempo(config.tempo.access_token)
+        tempo = Tempo(
+            config.tempo.access_token,
+            reauthenticate=refresh_access_token,
+        )
         jira = Jira.auth_by_tempo(tempo)
-        wrapper(TempoUI(tempo, jira))
+        store = WorklogStore.for_account(
+            config.jira.url, account_id(jira, config)
+        )
+        wrapper(TempoUI(tempo, jira, store))
     except Exception:
         logging.exception('Uncaught exception')
+
+
+@ensure_auth
+def bulk(args, config):
+    from tempo.api import Tempo
+    tempo = Tempo(
+        config.tempo.access_token,
+        reauthenticate=refresh_access_token,
+    )
+    return run_bulk(
+        tempo,
+        args.file,
+        frmt=args.format,
+        workers=args.workers,
+        journal=args.journal,
+    )
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog='tempo-cli')
+    parser.add_argument(
+        '--version', action='version', version=f'%(prog)s {__version__}'
+    )
+    parser.set_defaults(func=ui)
+    subparsers = parser.add_subparsers()
+    parser.add_argument(
+        '--metrics-file',
+        help='Write request metrics to this JSON file on exit',
+    )
+    bulk_parser = subparsers.add_parser(
+        'bulk',
+        help='Create or update worklogs from a CSV or NDJSON file',
+        description='Durations are hours unless given a unit, as in '
+        '1.5, 1h 30m, 90m or 5400s. Billable defaults to the time spent.',
+    )
+    bulk_parser.add_argument('file', help='Input file, or - for stdin')
+    bulk_parser.add_argument('--format', choices=FORMATS)
+    bulk_parser.add_argument('--workers', type=int, default=8)
+    bulk_parser.add_argument(
+        '--journal',
+        help='Record written rows here and skip them when resuming',
+    )
+    bulk_parser.set_defaults(func=bulk)
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    from tempo.logging_utils import configure_logging
+    configure_logging()
+    dump_metrics_on_exit(args.metrics_file)
+    sys.exit(args.func(args))
+
+
+def dump_metrics_on_exit(path=None):
+    from tempo.config import config
+    path = path or config.http.metrics_file
+    if path:
+        import atexit
+        from tempo.api.metrics import metrics
+        atexit.register(metrics.dump, os.path.expanduser(path))
@@ -6,9 +6,23 @@ logger = logging.getLogger(__name__)
 
 
 class Component:
-    def __init__(self, stdscr, tempo, jira, close, on_top):
+    # Components that take free text get printable keys through key_input
+    text_input = False
+
+    def __init__(
+        self,
+        stdscr,
+        tempo,
+        jira,
+        close,
+        on_top,
+        store=None,
+        issue_index=None,
+    ):
         self.tempo = tempo
         self.jira = jira
+        self.store = store
+        self.issue_index = issue_index
         self.stdscr = stdscr
         self.close = close
         self.on_top = on_top
@@ -48,6 +62,12 @@ class Component:
     def key_select(self, key):
         pass
 
+    def accepts(self, key):
+        return False
+
+    def key_input(self, key):
+        pass
+
     def addstr(self, *args, **kwargs):
         self.stdscr.addstr(*args, **kwargs)
 
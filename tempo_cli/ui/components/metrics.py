@@ -0,0 +1,91 @@
+import logging
+import curses
+
+from tempo.api.metrics import metrics
+from tempo_cli.ui.base import Component
+
+logger = logging.getLogger(__name__)
+
+ENDPOINT_COLUMNS = (
+    ('Calls', 6), ('Errors', 7), ('Retries', 8), ('Cached', 7),
+    ('p50 ms', 8), ('p90 ms', 8), ('p99 ms', 8), ('KB', 9),
+)
+CALL_COLUMNS = (('Hits', 6), ('Misses', 7), ('Joined', 7), ('Hit rate', 9))
+
+
+def row(values, columns):
+    return ''.join(
+        str('-' if value is None else value).rjust(width)
+        for value, (_, width) in zip(values, columns)
+    )
+
+
+class MetricsView(Component):
+    '''
+        Request counts, latencies and cache hit rates of this session.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bind_key('r', self.refresh, 'Refresh')
+
+    def display(self):
+        y, x = self.get_dimensions()
+        snapshot = metrics.snapshot()
+        lines = []
+        name_width = max(
+            [len(key) for key in snapshot['endpoints']]
+            + [len(name) for name in snapshot['calls']]
+            + [20]
+        ) + 1
+        lines.append((
+            'Endpoint'.ljust(name_width)
+            + row([title for title, _ in ENDPOINT_COLUMNS], ENDPOINT_COLUMNS),
+            curses.A_BOLD,
+        ))
+        for key, stats in snapshot['endpoints'].items():
+            latency = stats['latency_ms']
+            lines.append((
+                key.ljust(name_width) + row(
+                    [
+                        stats['calls'],
+                        stats['errors'],
+                        stats['retries'],
+                        stats['cache_hits'],
+                        latency.get('p50'),
+                        latency.get('p90'),
+                        latency.get('p99'),
+                        round(stats['bytes'] / 1024, 1),
+                    ],
+                    ENDPOINT_COLUMNS,
+                ),
+                curses.A_NORMAL,
+            ))
+        lines.append(('', curses.A_NORMAL))
+        lines.append((
+            'Method'.ljust(name_width)
+            + row([title for title, _ in CALL_COLUMNS], CALL_COLUMNS),
+            curses.A_BOLD,
+        ))
+        for name, stats in snapshot['calls'].items():
+            lines.append((
+                name.ljust(name_width) + row(
+                    [
+                        stats['hits'],
+                        stats['misses'],
+                        stats['coalesced'],
+                        stats['hit_rate'],
+                    ],
+                    CALL_COLUMNS,
+                ),
+                curses.A_NORMAL,
+            ))
+        wait = snapshot['queue_wait_ms']
+        lines.append(('', curses.A_NORMAL))
+        lines.append((
+            f'Background queue wait: {wait["count"]} requests, '
+            f'p50 {wait.get("p50", "-")} ms, p99 {wait.get("p99", "-")} ms',
+            curses.A_NORMAL,
+        ))
+        for i, (line, mode) in enumerate(lines[:y - 1]):
+            self.addstr(i + 1, 1, line[:x - 2], mode)
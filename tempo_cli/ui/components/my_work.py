@@ -3,9 +3,12 @@ import logging
 import curses
 
 from tempo.config import config
+from tempo.api.executor import get_executor
+from tempo.frame import WorklogFrame
 from tempo_cli.ui.base import Component
 from tempo_cli.ui.utils import delta_to_human, sec_to_human, date_to_human
 from tempo_cli.ui.components.worklog_form import WorklogForm
+from tempo_cli.ui.components.metrics import MetricsView
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +21,19 @@ class MyWork(Component):
             date = datetime.date.today()
         self.selected_worklog = None
         self.date = date
+        self.user = None
         self.get_data()
         self.bind_key('c', self.create_worklog, 'Log work')
+        self.bind_key('m', self.show_metrics, 'Metrics')
 
     def get_data(self):
-        self.user = self.jira.myself(cache=True)
+        self.error = ''
+        if self.user is None:
+            self.jira.myself(
+                cache=True,
+                callback=self.receive_user,
+                error_callback=self.receive_error,
+            )
         self.get_worklogs()
         self.get_schedules()
 
@@ -32,6 +43,9 @@ class MyWork(Component):
             'create_callback': self.worklog_created,
         }
 
+    def show_metrics(self, key):
+        return MetricsView, {}
+
     def daterange(self):
         from_date = self.date
         while from_date.weekday() != int(config.tempo.first_day_of_week):
@@ -42,15 +56,68 @@ class MyWork(Component):
     def select_first_worklog(self):
         if self.worklogs[self.date]:
             self.selected_worklog = self.worklogs[self.date][0]
-            logger.info(f'Selected worklog {self.selected_worklog.id}')
+            logger.info('Selected worklog %s', self.selected_worklog.id)
         else:
             self.selected_worklog = None
 
-    def receive_worklogs(self, worklogs):
+    def set_worklogs(self, worklogs):
+        for day in self.worklogs.values():
+            day.clear()
         for worklog in sorted(worklogs, key=lambda x: x.started):
-            self.worklogs[worklog.started.date()].append(worklog)
-
+            if worklog.started.date() in self.worklogs:
+                self.worklogs[worklog.started.date()].append(worklog)
+            if self.issue_index is not None:
+                self.issue_index.add(
+                    worklog.issue.key, used_at=worklog.started.timestamp()
+                )
         self.select_first_worklog()
+        self.update_totals()
+        self.resolve_issues()
+
+    def update_totals(self):
+        # A week of worklogs is summed faster than numpy is imported.
+        frame = WorklogFrame.from_worklogs(
+            (
+                worklog
+                for worklogs in self.worklogs.values()
+                for worklog in worklogs
+            ),
+            backend='python',
+        )
+        self.day_totals = frame.group_by('day')
+
+    def resolve_issues(self):
+        keys = [
+            worklog.issue.key
+            for worklogs in self.worklogs.values()
+            for worklog in worklogs
+        ]
+        if self.jira.issue_resolver.missing(keys):
+            get_executor().submit(
+                self.jira.issue_resolver.resolve,
+                keys,
+                callback=self.receive_issues,
+                error_callback=self.receive_error,
+                supersede=('my_work', 'issues'),
+            )
+
+    def receive_user(self, user):
+        self.user = user
+        self.refresh()
+
+    def receive_worklogs(self, worklogs):
+        self.set_worklogs(worklogs)
+        self.refresh()
+
+    def receive_synced(self, changed):
+        if changed:
+            self.receive_worklogs(self.store.worklogs(*self.daterange()))
+
+    def receive_issues(self, issues):
+        if self.issue_index is not None:
+            for key, issue in issues.items():
+                if issue is not None:
+                    self.issue_index.add(key, issue.summary)
         self.refresh()
 
     def get_worklogs(self):
@@ -61,12 +128,28 @@ class MyWork(Component):
         while walker <= to_date:
             self.worklogs[walker] = []
             walker += datetime.timedelta(1)
+        self.day_totals = {}
 
-        self.tempo.worklogs(
+        if self.store is not None:
+            self.set_worklogs(self.store.worklogs(from_date, to_date))
+            get_executor().submit(
+                self.store.sync,
+                self.tempo,
+                from_date,
+                to_date,
+                callback=self.receive_synced,
+                error_callback=self.receive_error,
+                supersede=('my_work', 'worklogs'),
+            )
+            return
+
+        self.tempo.all_worklogs(
             # TODO: Account id
             from_date=from_date,
             to_date=to_date,
-            callback=self.receive_worklogs
+            callback=self.receive_worklogs,
+            error_callback=self.receive_error,
+            supersede=('my_work', 'worklogs'),
         )
 
     def receive_schedules(self, user_schedules):
@@ -76,25 +159,61 @@ class MyWork(Component):
         logger.info('selfsched: %s', self.schedules.keys())
         self.refresh()
 
+    def receive_synced_schedules(self, changed):
+        if changed:
+            self.receive_schedules(self.store.schedules(*self.daterange()))
+
     def get_schedules(self):
         self.schedules = {}
         from_date, to_date = self.daterange()
+        if self.store is not None:
+            for schedule in self.store.schedules(from_date, to_date):
+                self.schedules[schedule.date] = schedule
+            get_executor().submit(
+                self.store.sync_schedules,
+                self.tempo,
+                from_date,
+                to_date,
+                callback=self.receive_synced_schedules,
+                error_callback=self.receive_error,
+                supersede=('my_work', 'schedules'),
+            )
+            return
         self.tempo.user_schedules(
             # TODO: Account id
             from_date=from_date,
             to_date=to_date,
-            callback=self.receive_schedules
+            callback=self.receive_schedules,
+            error_callback=self.receive_error,
+            supersede=('my_work', 'schedules'),
         )
 
-    def short_worklog_display(self, worklog):
-        return (
+    def receive_error(self, exception):
+        logger.error('Background request failed', exc_info=exception)
+        self.error = str(getattr(exception, 'error', None) or exception)
+        self.refresh()
+
+    def short_worklog_display(self, worklog, width):
+        display = (
             f'{worklog.issue.key} - {delta_to_human(worklog.time_spent)}'
         )
+        issue = self.jira.issue_resolver.get(worklog.issue.key)
+        if issue is not None and issue.summary:
+            display = f'{display} {issue.summary}'
+        return display[:width - 1]
 
     def display(self):
         y, x = self.get_dimensions()
         column_width = int(x / 7)
-        self.addstr(1, 1, f'Hi {self.user.display_name}!')
+        if self.user is not None:
+            self.addstr(1, 1, f'Hi {self.user.display_name}!')
+        if self.error:
+            self.addstr(
+                1,
+                column_width,
+                self.error.splitlines()[0][:x - column_width - 1],
+                curses.color_pair(curses.COLOR_RED),
+            )
         for col, (date, worklogs) in enumerate(self.worklogs.items()):
             colstart = col * column_width + 1
             if date == self.date:
@@ -106,13 +225,7 @@ class MyWork(Component):
             )
             if date in self.schedules:
                 schedule = self.schedules[date]
-                if date in self.worklogs:
-                    worked_seconds = sum(
-                        worklog.time_spent.total_seconds()
-                        for worklog in self.worklogs[date]
-                    )
-                else:
-                    worked_seconds = 0
+                worked_seconds = self.day_totals.get(date, 0)
                 if schedule.required.total_seconds() > worked_seconds:
                     mode = curses.color_pair(curses.COLOR_RED)
                 else:
@@ -137,7 +250,7 @@ class MyWork(Component):
                 self.addstr(
                     i + 5,
                     colstart,
-                    self.short_worklog_display(worklog),
+                    self.short_worklog_display(worklog, column_width),
                     mode,
                 )
 
@@ -148,7 +261,7 @@ class MyWork(Component):
             if idx > 0:
                 worklog = worklogs[idx - 1]
                 self.selected_worklog = worklog
-                logger.info(f'Selected worklog {self.selected_worklog.id}')
+                logger.info('Selected worklog %s', self.selected_worklog.id)
 
     def key_down(self, key):
         worklogs = self.worklogs[self.date]
@@ -157,11 +270,11 @@ class MyWork(Component):
             if idx + 1 < len(worklogs):
                 worklog = worklogs[idx + 1]
                 self.selected_worklog = worklog
-                logger.info(f'Selected worklog {self.selected_worklog.id}')
+                logger.info('Selected worklog %s', self.selected_worklog.id)
 
     def key_left(self, key):
         self.date -= datetime.timedelta(1)
-        logger.info(f'Selected date {self.date}')
+        logger.info('Selected date %s', self.date)
         if self.date in self.worklogs:
             self.select_first_worklog()
         else:
@@ -169,7 +282,7 @@ class MyWork(Component):
 
     def key_right(self, key):
         self.date += datetime.timedelta(1)
-        logger.info(f'Selected date {self.date}')
+        logger.info('Selected date %s', self.date)
         if self.date in self.worklogs:
             self.select_first_worklog()
         else:
@@ -183,6 +296,8 @@ class MyWork(Component):
             }
 
     def worklog_created(self, worklog):
+        if self.store is not None:
+            self.store.upsert_worklogs([worklog])
         for date in self.worklogs:
             for i in range(len(self.worklogs[date])):
                 if self.worklogs[date][i].id == worklog.id:
@@ -191,3 +306,4 @@ class MyWork(Component):
         if worklog.started.date() in self.worklogs:
             self.worklogs[worklog.started.date()].append(worklog)
             self.selected_worklog = worklog
+        self.update_totals()
@@ -1,10 +1,14 @@
 import datetime
+import functools
 import os
+import re
+import threading
 import tempfile
 import subprocess
 import logging
 import curses
 
+from tempo_cli.issue_index import IssueIndex
 from tempo_cli.ui.base import Component
 from tempo_cli.ui.utils import (
     sec_to_human, datetime_to_human, human_to_seconds, human_to_datetime,
@@ -197,47 +201,130 @@ class TimeEditor(Editor):
 
 
 class IssueEditor(Editor):
-    def update(self, data):
-        return IssuePicker, {'search': data, 'callback': super().update}
+    def __call__(self, update, data=None):
+        self._update = update
+        return IssuePicker, {'search': data or '', 'callback': self.update}
 
 
 class IssuePicker(Component):
+    '''
+        Typeahead issue search. Matches from the local issue index show
+        as soon as a key is typed, Jira picker results are merged in once
+        typing pauses.
+    '''
+    text_input = True
+    debounce = 0.3
+    backspace_keys = (curses.KEY_BACKSPACE, 127, 8)
+    issue_key_re = re.compile(r'^[A-Z][A-Z0-9_]+-\d+$')
+
     def __init__(self, search, callback, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.sections = self.jira.issue_picker(search)
-        self.selected_issue = None
+        del self.bound_keys[ord('q')]
+        del self.key_legend['q']
+        self.bind_key(27, self.cancel)
+        self.key_legend['Esc'] = 'Cancel'
+        if self.issue_index is None:
+            self.issue_index = IssueIndex()
         self.callback = callback
+        self.query = search
+        self.results = []
+        self.selected = 0
+        self.error = ''
+        self.timer = None
+        self.search()
 
-    def display(self):
-        i = 0
-        self.issues = []
-        for section in self.sections:
-            self.addstr(i, 1, section.label)
-            i += 1
+    def accepts(self, key):
+        return 32 <= key < 127 or key in self.backspace_keys
+
+    def key_input(self, key):
+        if key in self.backspace_keys:
+            self.query = self.query[:-1]
+        else:
+            self.query += chr(key)
+        self.search()
+
+    def search(self):
+        self.selected = 0
+        self.results = self.issue_index.search(self.query)
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.query.strip():
+            self.timer = threading.Timer(
+                self.debounce, self.search_remote, args=(self.query, )
+            )
+            self.timer.daemon = True
+            self.timer.start()
+
+    def search_remote(self, query):
+        self.jira.issue_picker(
+            query,
+            callback=functools.partial(self.receive_remote, query),
+            error_callback=self.receive_error,
+            supersede=('issue_picker', ),
+        )
+
+    def receive_remote(self, query, sections):
+        self.issue_index.add_picker_sections(sections)
+        if query != self.query:
+            return
+        selected_key = self.selected_key()
+        keys = {key for key, summary in self.results}
+        for section in sections:
             for issue in section.issues:
-                if not self.selected_issue:
-                    self.selected_issue = issue
-                if issue == self.selected_issue:
-                    mode = curses.A_REVERSE
-                else:
-                    mode = curses.A_NORMAL
-                self.addstr(i, 5, f'{issue.key} - {issue.summary}', mode)
-                i += 1
-                self.issues.append(issue)
-        if not self.issues:
-            self.callback(None)
-            self.close()
+                if issue.key not in keys:
+                    keys.add(issue.key)
+                    self.results.append((issue.key, issue.summary))
+        for i, (key, summary) in enumerate(self.results):
+            if key == selected_key:
+                self.selected = i
+        self.refresh()
+
+    def receive_error(self, exception):
+        logger.error('Issue search failed', exc_info=exception)
+        self.error = str(getattr(exception, 'error', None) or exception)
+        self.refresh()
+
+    def selected_key(self):
+        if self.results:
+            return self.results[self.selected][0]
+        return None
+
+    def display(self):
+        y, x = self.get_dimensions()
+        self.addstr(0, 1, f'Issue: {self.query}'[:x - 2])
+        for i, (key, summary) in enumerate(self.results[:y - 3]):
+            if i == self.selected:
+                mode = curses.A_REVERSE
+            else:
+                mode = curses.A_NORMAL
+            self.addstr(i + 2, 3, f'{key} - {summary or ""}'[:x - 4], mode)
+        if self.error:
+            self.addstr(
+                y - 1,
+                1,
+                self.error.splitlines()[0][:x - 2],
+                curses.color_pair(curses.COLOR_RED),
+            )
 
     def key_up(self, key):
-        idx = self.issues.index(self.selected_issue)
-        if idx > 0:
-            self.selected_issue = self.issues[idx - 1]
+        if self.selected > 0:
+            self.selected -= 1
 
     def key_down(self, key):
-        idx = self.issues.index(self.selected_issue)
-        if idx + 1 < len(self.issues):
-            self.selected_issue = self.issues[idx + 1]
+        if self.selected + 1 < len(self.results):
+            self.selected += 1
 
     def key_select(self, key):
-        self.callback(self.selected_issue.key)
+        issue_key = self.selected_key()
+        if issue_key is None and self.issue_key_re.match(self.query.upper()):
+            issue_key = self.query.upper()
+        if issue_key is not None:
+            self.issue_index.touch(issue_key)
+            self.callback(issue_key)
+            self.cancel()
+
+    def cancel(self, key=None):
+        if self.timer is not None:
+            self.timer.cancel()
         self.close()
@@ -3,6 +3,7 @@ import locale
 import inspect
 import curses
 
+from tempo_cli.issue_index import IssueIndex
 from tempo_cli.ui.components.my_work import MyWork
 from tempo_cli.ui.base import Component
 
@@ -12,9 +13,14 @@ logger = logging.getLogger(__name__)
 class TempoUI:
     stdscr = None
 
-    def __init__(self, tempo, jira):
+    def __init__(self, tempo, jira, store=None):
         self.tempo = tempo
         self.jira = jira
+        self.store = store
+        self.issue_index = IssueIndex()
+        if store is not None:
+            for issue_key, used_at in store.recent_issue_keys():
+                self.issue_index.add(issue_key, used_at=used_at)
         self.running = True
         self.page_stack = []
 
@@ -26,6 +32,8 @@ class TempoUI:
             'jira': self.jira,
             'close': self.go_back,
             'on_top': self.on_top,
+            'store': self.store,
+            'issue_index': self.issue_index,
         }
         curses.use_default_colors()
         curses.init_pair(curses.COLOR_RED, curses.COLOR_RED, -1)
@@ -58,7 +66,9 @@ class TempoUI:
     def navigate(self):
         key = self.stdscr.getch()
         target = None
-        if key in (curses.KEY_ENTER, ord('\n')):
+        if self.page.text_input and self.page.accepts(key):
+            target = self.page.key_input
+        elif key in (curses.KEY_ENTER, ord('\n')):
             target = self.page.key_select
         elif key in (curses.KEY_UP, ord('k')):
             target = self.page.key_up